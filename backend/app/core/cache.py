@@ -0,0 +1,179 @@
+"""Disk-backed result cache stored in the application SQLite database.
+
+Entries are grouped by namespace and carry their own expiry time. Each
+namespace is bounded by entry count and total payload size; when a limit is
+exceeded the least recently used entries are evicted first. Because the data
+lives in SQLite it survives restarts and is shared by every worker process.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Optional
+
+from .config import settings
+from .database import get_connection
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS result_cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS result_cache_lru
+    ON result_cache (namespace, last_access);
+"""
+
+_schema_lock = threading.Lock()
+_schema_ready: set = set()
+
+
+def _connect() -> sqlite3.Connection:
+    """Return a connection with the cache schema in place."""
+    conn = get_connection()
+    db = settings.database_url
+    if db not in _schema_ready:
+        with _schema_lock:
+            if db not in _schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                conn.commit()
+                _schema_ready.add(db)
+    return conn
+
+
+class ResultCache:
+    """Namespaced persistent cache with per-entry TTL and LRU eviction."""
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self.namespace = namespace
+        self.ttl = ttl if ttl is not None else settings.cache_ttl
+        self.max_entries = (
+            max_entries if max_entries is not None else settings.cache_max_entries
+        )
+        self.max_bytes = (
+            max_bytes if max_bytes is not None else settings.cache_max_bytes
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key`` or ``None`` if missing/expired."""
+        now = time.time()
+        try:
+            with closing(_connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM result_cache"
+                    " WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is None:
+                    CACHE_REQUESTS.inc(cache=self.namespace, result="miss")
+                    return None
+                value, expires_at = row
+                if expires_at <= now:
+                    conn.execute(
+                        "DELETE FROM result_cache WHERE namespace = ? AND key = ?",
+                        (self.namespace, key),
+                    )
+                    CACHE_REQUESTS.inc(cache=self.namespace, result="miss")
+                    return None
+                conn.execute(
+                    "UPDATE result_cache SET last_access = ?"
+                    " WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key),
+                )
+            CACHE_REQUESTS.inc(cache=self.namespace, result="hit")
+            return json.loads(value)
+        except (sqlite3.Error, ValueError) as exc:
+            logger.warning("cache read failed for %s/%s: %s", self.namespace, key, exc)
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key`` and evict entries over the limits."""
+        now = time.time()
+        try:
+            payload = json.dumps(value, default=str)
+        except (TypeError, ValueError) as exc:
+            logger.warning(
+                "cache value for %s/%s not serializable: %s", self.namespace, key, exc
+            )
+            return
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        try:
+            with closing(_connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO result_cache"
+                    " (namespace, key, value, size, expires_at, last_access)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, payload, len(payload), expires_at, now),
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as exc:
+            logger.warning("cache write failed for %s/%s: %s", self.namespace, key, exc)
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` from the cache."""
+        try:
+            with closing(_connect()) as conn, conn:
+                conn.execute(
+                    "DELETE FROM result_cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+        except sqlite3.Error as exc:
+            logger.warning(
+                "cache delete failed for %s/%s: %s", self.namespace, key, exc
+            )
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace."""
+        try:
+            with closing(_connect()) as conn, conn:
+                conn.execute(
+                    "DELETE FROM result_cache WHERE namespace = ?", (self.namespace,)
+                )
+        except sqlite3.Error as exc:
+            logger.warning("cache clear failed for %s: %s", self.namespace, exc)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least recently used ones over the limits."""
+        conn.execute(
+            "DELETE FROM result_cache WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now),
+        )
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM result_cache"
+            " WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, size FROM result_cache WHERE namespace = ?"
+            " ORDER BY last_access ASC",
+            (self.namespace,),
+        )
+        victims = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((self.namespace, key))
+            count -= 1
+            total -= size
+        conn.executemany(
+            "DELETE FROM result_cache WHERE namespace = ? AND key = ?", victims
+        )
@@ -0,0 +1,196 @@
+"""Per-source circuit breakers for external intelligence APIs.
+
+A breaker tracks the outcome of recent calls to one source. Once at least
+``min_calls`` calls in the last ``window`` seconds have failed at a rate of
+``failure_rate`` or more, it opens and calls fail immediately with
+:class:`CircuitOpenError` instead of waiting out a network timeout. After
+``reset_timeout`` seconds a single probe call is let through (half-open);
+its success closes the breaker and its failure opens it again.
+
+:func:`guarded_get` and :func:`a_guarded_get` wrap a GET to a source in its
+breaker: both raise :class:`CircuitOpenError` while it is open, and record
+transport errors as failures before re-raising them.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import httpx
+import requests
+
+from .config import settings
+from .http import get_http_client
+from .metrics import BREAKER_REJECTIONS, BREAKER_TRANSITIONS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected by an open circuit breaker."""
+
+    def __init__(self, source: str) -> None:
+        super().__init__(f"{source} circuit open")
+        self.source = source
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for a single source."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        window: Optional[float] = None,
+        reset_timeout: Optional[float] = None,
+    ) -> None:
+        self.name = name
+        self.failure_rate = (
+            settings.breaker_failure_rate if failure_rate is None else failure_rate
+        )
+        self.min_calls = settings.breaker_min_calls if min_calls is None else min_calls
+        self.window = settings.breaker_window if window is None else window
+        self.reset_timeout = (
+            settings.breaker_reset_timeout if reset_timeout is None else reset_timeout
+        )
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self._calls: Deque[Tuple[float, bool]] = deque()
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            BREAKER_TRANSITIONS.inc(source=self.name, state=state)
+
+    def _trim(self, now: float) -> None:
+        while self._calls and self._calls[0][0] < now - self.window:
+            self._calls.popleft()
+
+    def before_call(self) -> None:
+        """Raise :class:`CircuitOpenError` unless a call may proceed now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            # a probe that never reported back (e.g. cancelled) is replaced
+            if self.state == HALF_OPEN and (
+                self._probe_started is None
+                or now - self._probe_started >= self.reset_timeout
+            ):
+                self._probe_started = now
+                return
+        BREAKER_REJECTIONS.inc(source=self.name)
+        raise CircuitOpenError(self.name)
+
+    def record_success(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._probe_started = None
+                self._calls.clear()
+                self._set_state(CLOSED)
+            self._calls.append((now, True))
+            self._trim(now)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._probe_started = None
+                self._open(now)
+                return
+            self._calls.append((now, False))
+            self._trim(now)
+            failures = sum(1 for _, ok in self._calls if not ok)
+            if (
+                self.state == CLOSED
+                and len(self._calls) >= self.min_calls
+                and failures / len(self._calls) >= self.failure_rate
+            ):
+                self._open(now)
+
+    def record_status(self, status_code: int) -> None:
+        """Record an HTTP response by its status code."""
+        if is_failure_status(status_code):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def _open(self, now: float) -> None:
+        self.opened_at = now
+        self._set_state(OPEN)
+
+    def status(self) -> Dict:
+        """Return the state and recent outcome counts for health reporting."""
+        with self._lock:
+            self._trim(time.monotonic())
+            failures = sum(1 for _, ok in self._calls if not ok)
+            status = {
+                "state": self.state,
+                "calls": len(self._calls),
+                "failures": failures,
+            }
+            if self.state != CLOSED:
+                status["retry_in"] = round(
+                    max(0.0, self.opened_at + self.reset_timeout - time.monotonic()), 1
+                )
+            return status
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the shared breaker for source ``name``."""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_status() -> Dict[str, Dict]:
+    """Return the status of every breaker, keyed by source."""
+    with _registry_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.status() for name, breaker in sorted(breakers.items())}
+
+
+def is_failure_status(status_code: int) -> bool:
+    """Return True for responses that indicate the source is unhealthy."""
+    return status_code >= 500 or status_code == 429
+
+
+def guarded_get(source: str, url: str, timeout: float = 10) -> requests.Response:
+    """GET ``url`` with :mod:`requests` through the breaker of ``source``."""
+    breaker = get_breaker(source)
+    breaker.before_call()
+    try:
+        r = requests.get(url, timeout=timeout)
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_status(r.status_code)
+    return r
+
+
+async def a_guarded_get(source: str, url: str) -> httpx.Response:
+    """Async variant of :func:`guarded_get` using the shared HTTP client."""
+    breaker = get_breaker(source)
+    breaker.before_call()
+    try:
+        r = await get_http_client().get(url)
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_status(r.status_code)
+    return r
@@ -1,10 +1,87 @@
+import os
+from typing import Dict
+
 from pydantic import BaseSettings
 
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data"))
+
+
 class Settings(BaseSettings):
     """Application configuration with environment support."""
     app_name: str = "ForensiTrain API"
     database_url: str = "forensitrain.db"
     api_base_url: str = "http://localhost:8000/api"
+    dataset_path: str = os.path.join(DATA_DIR, "mock_data.json")
+    # persistent result cache (see core/cache.py)
+    cache_ttl: int = 6 * 60 * 60
+    cache_max_entries: int = 10_000
+    cache_max_bytes: int = 256 * 1024 * 1024
+    # in-memory cache of raw scylla/dehashed responses
+    breach_cache_ttl: int = 60 * 60
+    breach_cache_size: int = 4096
+    # circuit breakers for external sources (see core/circuit_breaker.py)
+    breaker_failure_rate: float = 0.5
+    breaker_min_calls: int = 5
+    breaker_window: float = 60.0
+    breaker_reset_timeout: float = 30.0
+    # shared outbound HTTP client (see core/http.py)
+    http_timeout: float = 10.0
+    http_connect_timeout: float = 5.0
+    http_max_connections: int = 100
+    http_max_keepalive: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_per_host_connections: int = 10
+    http2: bool = True
+    # per-host outbound scheduling: requests/second, burst size, overrides by
+    # host name, and the limits of the adaptive 429 backoff
+    http_host_rate: float = 5.0
+    http_host_burst: float = 10.0
+    http_host_rates: Dict[str, float] = {}
+    http_max_backoff: float = 60.0
+    http_min_host_rate: float = 0.2
+    # most of a profile page downloaded when looking for its images
+    html_max_bytes: int = 512 * 1024
+    # external CLI tools (see core/subprocess_pool.py)
+    subprocess_timeout: float = 60.0
+    subprocess_max_concurrency: int = 4
+    subprocess_tool_concurrency: int = 2
+    # Maigret/Sherlock results keyed by (tool, target, site set)
+    scan_cache_ttl: int = 6 * 60 * 60
+    scan_cache_size: int = 2048
+    # concurrent external scans per smart OSINT lookup
+    osint_concurrency: int = 8
+    # multi_source_lookup: total budget, per-source deadline (with overrides by
+    # source name) and whether late sources keep running to warm the caches
+    lookup_budget: float = 20.0
+    lookup_source_timeout: float = 15.0
+    lookup_source_timeouts: Dict[str, float] = {}
+    lookup_finish_in_background: bool = True
+    # bulk phone analysis: numbers per request and lookups in flight overall
+    bulk_max_numbers: int = 10000
+    bulk_concurrency: int = 8
+    # background jobs: workers per process, idle poll interval, claim lease and
+    # claims of a job before it is failed as crashing its worker
+    job_workers: int = 2
+    job_poll_interval: float = 1.0
+    job_lease: int = 300
+    job_max_attempts: int = 3
+    # image analysis worker processes (0 runs analyses in threads instead)
+    image_workers: int = max(1, (os.cpu_count() or 2) // 2)
+    image_queue_limit: int = 32
+    # pixel budgets for OCR and face/object detection inputs
+    image_ocr_max_pixels: int = 4_000_000
+    image_detect_max_pixels: int = 1_000_000
+    # batch endpoint: images per worker call and per request
+    image_batch_size: int = 8
+    image_batch_max_files: int = 500
+    # zip uploads: entries per archive, uncompressed bytes per image and total
+    image_zip_max_members: int = 2000
+    image_zip_max_member_bytes: int = 32 * 1024 * 1024
+    image_zip_max_bytes: int = 512 * 1024 * 1024
+    # image analysis results keyed by content hash
+    image_cache_ttl: int = 7 * 24 * 60 * 60
+    image_cache_size: int = 512
+    image_cache_max_bytes: int = 64 * 1024 * 1024
 
     class Config:
         env_file = '.env'
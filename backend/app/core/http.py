@@ -0,0 +1,262 @@
+"""Application-scoped pooled HTTP client shared by all services.
+
+The app's :class:`httpx.AsyncClient` is created at startup (stored on
+``app.state.http_client``) and borrowed by the services through
+:func:`get_http_client`, so keep-alive connections to repeat hosts are reused
+instead of paying connection and TLS setup on every call. Other event loops
+(the synchronous wrappers) get a client of their own. HTTP/2 is enabled
+when the optional ``h2`` package is installed.
+
+Every request goes through a per-host scheduler: a concurrency cap, a token
+bucket and adaptive backoff. A 429 (or 503 with ``Retry-After``) pauses the
+host for the advertised time, or an exponentially growing delay, and halves
+its request rate; successful responses restore the rate gradually.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from .config import settings
+from .metrics import HTTP_THROTTLED
+
+T = TypeVar("T")
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body wrapper that runs ``release`` once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostThrottle:
+    """Token bucket and adaptive backoff for one host.
+
+    Throttles are shared by every client in the process, so a backoff learnt
+    on one event loop also holds requests from the others. State changes are
+    guarded by a thread lock.
+    """
+
+    def __init__(self, host: str, rate: float, burst: float) -> None:
+        self.host = host
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return 0, or return how long to wait for one."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def wait_turn(self) -> None:
+        """Wait out any backoff, then take a token from the bucket."""
+        while (delay := self._reserve()) > 0:
+            await asyncio.sleep(delay)
+
+    def on_response(self, response: httpx.Response) -> None:
+        """Adapt the rate and backoff to the host's response."""
+        retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+        status = response.status_code
+        with self._lock:
+            if status == 429 or (status == 503 and retry_after is not None):
+                HTTP_THROTTLED.inc(host=self.host)
+                self.backoff = min(
+                    settings.http_max_backoff, max(1.0, self.backoff * 2)
+                )
+                delay = min(
+                    settings.http_max_backoff,
+                    retry_after if retry_after is not None else self.backoff,
+                )
+                self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+                self.rate = max(settings.http_min_host_rate, self.rate / 2)
+                self.tokens = min(self.tokens, 0.0)
+            elif status < 500:
+                self.backoff /= 2
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+_throttles: Dict[str, HostThrottle] = {}
+_throttles_lock = threading.Lock()
+
+
+class HostLimitedTransport(httpx.AsyncHTTPTransport):
+    """Connection-pooling transport scheduling requests per host.
+
+    Each host has a :class:`HostThrottle`, shared process-wide unless
+    ``throttles`` is given, and a per-transport concurrency slot held from
+    sending the request until the response body is closed, so the cap bounds
+    the open connections to each host.
+    """
+
+    def __init__(
+        self,
+        per_host: int,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        host_rates: Optional[Dict[str, float]] = None,
+        throttles: Optional[Dict[str, HostThrottle]] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.per_host = per_host
+        self.rate = settings.http_host_rate if rate is None else rate
+        self.burst = settings.http_host_burst if burst is None else burst
+        self.host_rates = settings.http_host_rates if host_rates is None else host_rates
+        self._throttles = _throttles if throttles is None else throttles
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def throttle(self, host: str) -> HostThrottle:
+        with _throttles_lock:
+            state = self._throttles.get(host)
+            if state is None:
+                rate = self.host_rates.get(host, self.rate)
+                state = self._throttles[host] = HostThrottle(
+                    host, rate, max(1.0, min(self.burst, rate * 10))
+                )
+            return state
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        throttle = self.throttle(request.url.host)
+        await throttle.wait_turn()
+        sem = self._semaphore(request.url.host)
+        await sem.acquire()
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            sem.release()
+            raise
+        throttle.on_response(response)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, sem.release),
+            extensions=response.extensions,
+        )
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Return a new pooled client configured from :data:`settings`."""
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    transport = HostLimitedTransport(
+        settings.http_per_host_connections,
+        limits=limits,
+        http2=settings.http2 and HTTP2_AVAILABLE,
+    )
+    timeout = httpx.Timeout(
+        settings.http_timeout, connect=settings.http_connect_timeout
+    )
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+
+# one client per event loop, since clients cannot be shared between loops
+_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Create the shared client for the running event loop."""
+    await close_http_client()
+    return get_http_client()
+
+
+async def close_http_client() -> None:
+    """Close the client belonging to the running event loop, if any."""
+    with _clients_lock:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the running event loop's client, creating it lazily.
+
+    Clients are bound to an event loop, so each loop (e.g. one started by
+    :func:`run_with_http_client`) gets its own; they share host throttles.
+    """
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = _clients[loop] = create_http_client()
+        return client
+
+
+def run_with_http_client(coro: Awaitable[T]) -> T:
+    """Run ``coro`` with :func:`asyncio.run`, closing the loop's client after.
+
+    Used by the synchronous wrappers so their short-lived loops do not leak
+    connection pools.
+    """
+
+    async def main() -> T:
+        try:
+            return await coro
+        finally:
+            await close_http_client()
+
+    return asyncio.run(main())
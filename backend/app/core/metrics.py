@@ -0,0 +1,290 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms are registered once at import time and
+updated by the services with label values, e.g.::
+
+    SOURCE_LATENCY.observe(0.42, source="hibp")
+
+:func:`render` produces the Prometheus text format served at
+``/api/metrics``. Values are per process; with several server workers each
+one exposes its own series.
+"""
+
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)  # fmt: skip
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Return the exposition lines of every label set; called locked."""
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{self._labels(key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels) -> Iterator[None]:
+        """Increment the gauge for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{self._labels(key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall-clock duration of the block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            item = self._values.get(self._key(labels))
+            return sum(item[0]) if item else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = self._labels(key, [("le", bound)])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(
+                f"{self.name}_sum{self._labels(key)} {_format_value(total[0])}"
+            )
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    """Return every registered metric in Prometheus text format."""
+    return REGISTRY.render()
+
+
+# shared metrics reported by the core helpers and services
+HTTP_REQUEST_LATENCY = Histogram(
+    "forensitrain_http_request_duration_seconds",
+    "Time to produce a response per API route.",
+    ("method", "route", "status"),
+)
+SOURCE_LATENCY = Histogram(
+    "forensitrain_source_duration_seconds",
+    "Duration of each phone lookup source.",
+    ("source",),
+)
+SOURCE_ERRORS = Counter(
+    "forensitrain_source_errors_total",
+    "Phone lookup sources that raised an error.",
+    ("source",),
+)
+CACHE_REQUESTS = Counter(
+    "forensitrain_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+)
+SUBPROCESS_INFLIGHT = Gauge(
+    "forensitrain_subprocess_inflight",
+    "External tool processes currently running.",
+    ("tool",),
+)
+SUBPROCESS_LATENCY = Histogram(
+    "forensitrain_subprocess_duration_seconds",
+    "External tool run time by outcome.",
+    ("tool", "outcome"),
+)
+HTTP_THROTTLED = Counter(
+    "forensitrain_http_throttled_total",
+    "Outbound responses asking us to slow down (429 or 503 with Retry-After).",
+    ("host",),
+)
+BREACH_FETCH_LATENCY = Histogram(
+    "forensitrain_breach_fetch_duration_seconds",
+    "Breach source API request time by outcome.",
+    ("source", "outcome"),
+)
+IMAGE_ANALYSIS_LATENCY = Histogram(
+    "forensitrain_image_analysis_duration_seconds",
+    "Time for uncached image analyses in the worker pool.",
+    ("mode",),
+)
+BREAKER_TRANSITIONS = Counter(
+    "forensitrain_circuit_breaker_transitions_total",
+    "Circuit breaker state changes by source and new state.",
+    ("source", "state"),
+)
+BREAKER_REJECTIONS = Counter(
+    "forensitrain_circuit_breaker_rejections_total",
+    "Calls rejected because the source's circuit breaker was open.",
+    ("source",),
+)
+JOBS_FINISHED = Counter(
+    "forensitrain_jobs_finished_total",
+    "Background jobs finished by kind and status.",
+    ("kind", "status"),
+)
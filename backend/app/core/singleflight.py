@@ -0,0 +1,68 @@
+"""Coalesce concurrent async calls for the same key into one shared task."""
+
+import asyncio
+import copy
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Registry of in-flight tasks keyed by call identity.
+
+    The first caller for a key starts the work; callers arriving while it runs
+    await the same task instead of starting their own. Waiters are shielded,
+    so a cancelled caller does not cancel the shared work for the others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result of ``factory()``, sharing it with concurrent callers."""
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(factory())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # mark the exception retrieved; awaiting callers still receive it
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+def _freeze(value: Any) -> Hashable:
+    """Return a hashable stand-in for dict, list and set arguments."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def single_flight(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Decorate a coroutine function so identical concurrent calls share one run.
+
+    Calls are keyed on their positional and keyword arguments; dicts, lists
+    and sets are compared by value. Each caller receives its own deep copy of
+    the result, so one caller mutating its response cannot affect the others.
+    The registry is exposed as ``wrapper.flights``.
+    """
+    flights = SingleFlight()
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        key = (_freeze(args), _freeze(kwargs))
+        return copy.deepcopy(await flights.do(key, lambda: func(*args, **kwargs)))
+
+    wrapper.flights = flights  # type: ignore[attr-defined]
+    return wrapper
@@ -0,0 +1,156 @@
+"""Bounded runner for external OSINT command line tools.
+
+Every run is capped by a global and a per-tool concurrency limit, shared by
+the async and blocking runners across all event loops and threads, captures
+stdout/stderr, and is started in its own session so that a timeout kills the
+whole process group (tools such as Maigret spawn helpers of their own).
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .config import settings
+from .metrics import SUBPROCESS_INFLIGHT, SUBPROCESS_LATENCY
+
+# one set of limits shared by the sync and async runners and all event loops
+_limits_lock = threading.Lock()
+_limits: Dict[str, threading.BoundedSemaphore] = {}
+_GLOBAL = ""
+# how often a waiting coroutine retries a full limit
+_POLL_INTERVAL = 0.05
+
+
+def _kill_group(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _semaphores(
+    tool: str,
+) -> Tuple[threading.BoundedSemaphore, threading.BoundedSemaphore]:
+    with _limits_lock:
+        if _GLOBAL not in _limits:
+            _limits[_GLOBAL] = threading.BoundedSemaphore(
+                settings.subprocess_max_concurrency
+            )
+        if tool not in _limits:
+            _limits[tool] = threading.BoundedSemaphore(
+                settings.subprocess_tool_concurrency
+            )
+        return _limits[_GLOBAL], _limits[tool]
+
+
+async def _acquire(sem: threading.BoundedSemaphore) -> None:
+    # polling keeps waiters off the thread pool and is safe to cancel
+    while not sem.acquire(blocking=False):
+        await asyncio.sleep(_POLL_INTERVAL)
+
+
+@asynccontextmanager
+async def _async_slot(tool: str) -> AsyncIterator[None]:
+    global_sem, tool_sem = _semaphores(tool)
+    await _acquire(tool_sem)
+    try:
+        await _acquire(global_sem)
+        try:
+            yield
+        finally:
+            global_sem.release()
+    finally:
+        tool_sem.release()
+
+
+async def run_tool(
+    tool: str,
+    cmd: List[str],
+    timeout: Optional[float] = None,
+    cwd: Optional[str] = None,
+) -> subprocess.CompletedProcess:
+    """Run ``cmd`` without blocking the event loop and return its output.
+
+    Raises :class:`FileNotFoundError` if the executable is missing and
+    :class:`subprocess.TimeoutExpired` after killing the process group when
+    ``timeout`` (default ``settings.subprocess_timeout``) elapses.
+    """
+    timeout = settings.subprocess_timeout if timeout is None else timeout
+    async with _async_slot(tool):
+        start, outcome = time.perf_counter(), "error"
+        SUBPROCESS_INFLIGHT.inc(tool=tool)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                start_new_session=True,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                _kill_group(proc.pid)
+                await proc.wait()
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                _kill_group(proc.pid)
+                # reap the killed process so it does not linger as a zombie
+                await asyncio.shield(proc.wait())
+                raise
+            outcome = "ok" if proc.returncode == 0 else "failed"
+        finally:
+            SUBPROCESS_INFLIGHT.dec(tool=tool)
+            SUBPROCESS_LATENCY.observe(
+                time.perf_counter() - start, tool=tool, outcome=outcome
+            )
+    return subprocess.CompletedProcess(
+        cmd,
+        proc.returncode,
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace"),
+    )
+
+
+def run_tool_sync(
+    tool: str,
+    cmd: List[str],
+    timeout: Optional[float] = None,
+    cwd: Optional[str] = None,
+) -> subprocess.CompletedProcess:
+    """Blocking counterpart of :func:`run_tool` for synchronous code paths."""
+    timeout = settings.subprocess_timeout if timeout is None else timeout
+    global_sem, tool_sem = _semaphores(tool)
+    with tool_sem, global_sem:
+        start, outcome = time.perf_counter(), "error"
+        SUBPROCESS_INFLIGHT.inc(tool=tool)
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                cwd=cwd,
+                start_new_session=True,
+            )
+            try:
+                stdout, stderr = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                outcome = "timeout"
+                _kill_group(proc.pid)
+                proc.communicate()
+                raise
+            outcome = "ok" if proc.returncode == 0 else "failed"
+        finally:
+            SUBPROCESS_INFLIGHT.dec(tool=tool)
+            SUBPROCESS_LATENCY.observe(
+                time.perf_counter() - start, tool=tool, outcome=outcome
+            )
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
@@ -0,0 +1,103 @@
+"""Thread-safe in-memory LRU cache with per-entry expiry."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .metrics import CACHE_REQUESTS
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after ``ttl`` seconds.
+
+    :meth:`get_or_set` holds a per-key lock while the value is computed, so
+    concurrent threads asking for the same key trigger a single computation.
+    Lookups are reported to the metrics registry under ``name`` when given.
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: float = 300.0, name: Optional[str] = None
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default``."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                expires_at, value = item
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    self._report("hit")
+                    return value
+                del self._data[key]
+            self.misses += 1
+            self._report("miss")
+            return default
+
+    def _report(self, result: str) -> None:
+        if self.name:
+            CACHE_REQUESTS.inc(cache=self.name, result=result)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key``, evicting the oldest entries if full."""
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove ``key`` if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry and reset statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_or_set(
+        self, key: Hashable, factory: Callable[[], Any], ttl: Optional[float] = None
+    ) -> Any:
+        """Return the cached value or compute it once with ``factory``.
+
+        ``None`` results and exceptions are not cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                with self._lock:
+                    item = self._data.get(key)
+                if item is not None and item[0] > time.monotonic():
+                    return item[1]
+                value = factory()
+                if value is not None:
+                    self.set(key, value, ttl)
+                return value
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
@@ -1,11 +1,19 @@
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from slowapi.errors import RateLimitExceeded
 import importlib
 
 from .core.logging_config import configure_logging
+from .core.http import start_http_client, close_http_client
+from .core import metrics
+from .core.circuit_breaker import breaker_status
+from .services.social_service import scan_cache_stats
+from .services.image_service import start_image_pool, shutdown_image_pool
+from .services.job_service import start_job_workers, stop_job_workers
 
 
 from .routers.phone import router as phone_router, limiter, rate_limit_handler
@@ -15,6 +23,7 @@ from .routers.integration import router as integration_router
 from .routers.workflow import router as workflow_router
 from .routers.geosocial import router as geosocial_router
 from .routers.osint import router as osint_router
+from .routers.jobs import router as jobs_router
 
 
 load_dotenv()
@@ -57,8 +66,19 @@ app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
 
 @app.on_event("startup")
 async def startup_event() -> None:
-    """Check heavy dependencies once at startup."""
+    """Check heavy dependencies and open the shared HTTP and worker pools."""
     app.state.dependencies = _check_dependencies()
+    app.state.http_client = await start_http_client()
+    start_image_pool()
+    start_job_workers()
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """Close pooled outbound connections and stop image and job workers."""
+    await stop_job_workers()
+    await close_http_client()
+    shutdown_image_pool()
 
 
 # Allow frontend development origins
@@ -71,6 +91,25 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    """Observe per-route response latency for the metrics endpoint."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
+
 @app.get("/", include_in_schema=False)
 def index() -> HTMLResponse:
     """Simple landing page explaining how to access the frontend."""
@@ -88,9 +127,20 @@ def index() -> HTMLResponse:
 
 @app.get("/api/health")
 def health_check():
-    """Return app status and availability of heavy dependencies."""
+    """Return app status, dependency availability, cache and breaker stats."""
     deps = getattr(app.state, "dependencies", {})
-    return {"status": "ok", "dependencies": deps}
+    return {
+        "status": "ok",
+        "dependencies": deps,
+        "scan_cache": scan_cache_stats(),
+        "circuit_breakers": breaker_status(),
+    }
+
+
+@app.get("/api/metrics", include_in_schema=False)
+def metrics_endpoint() -> Response:
+    """Expose in-process metrics in Prometheus text format."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 
 # Include phone analysis routes
@@ -101,3 +151,4 @@ app.include_router(integration_router, prefix="/api")
 app.include_router(workflow_router, prefix="/api/workflow")
 app.include_router(geosocial_router, prefix="/api/geosocial")
 app.include_router(osint_router, prefix="/api/osint")
+app.include_router(jobs_router, prefix="/api/jobs")
@@ -1,15 +1,25 @@
 from typing import List, Optional, Dict
 from pydantic import BaseModel
 
+
+class DetectedObject(BaseModel):
+    label: str
+    confidence: float
+    box: List[int]
+
+
 class ImageData(BaseModel):
     dimensions: str
     format: str
     text: str = ""
     faces_detected: int = 0
+    face_locations: List[List[int]] = []
     objects: List[str] = []
+    object_boxes: List[DetectedObject] = []
     exif: Optional[Dict[str, str]] = None
     inferred_platform: Optional[str] = None
 
+
 class ImageResponse(BaseModel):
     status: str
     data: Optional[ImageData] = None
@@ -0,0 +1,40 @@
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+
+
+class JobRequest(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+
+
+class EnrichmentParams(BaseModel):
+    phone_number: str
+
+
+class SmartLookupParams(BaseModel):
+    phone: str
+    depth: int = 2
+
+
+class IntegratedScanParams(BaseModel):
+    text: str
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: str
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    attempts: int = 0
+    result: Optional[Any] = None
+
+
+class JobResponse(BaseModel):
+    status: str
+    data: Optional[Job] = None
+    errors: Optional[str] = None
+    timestamp: str
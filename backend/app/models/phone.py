@@ -6,6 +6,11 @@ class PhoneRequest(BaseModel):
     phone_number: str
 
 
+class BulkPhoneRequest(BaseModel):
+    phone_numbers: List[str]
+    region: Optional[str] = None
+
+
 class PhoneData(BaseModel):
     phone_number: str
     valid: bool
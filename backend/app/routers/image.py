@@ -1,18 +1,126 @@
 from datetime import datetime
-from fastapi import APIRouter, UploadFile, File
+import io
+import json
+import os
+import zipfile
+from typing import List, Tuple
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from ..core.config import settings
 from ..models.image import ImageResponse
-from ..services.image_service import a_analyze_image_bytes
+from ..services.image_service import (
+    a_analyze_image_bytes,
+    a_analyze_image_batch,
+    ImageQueueFull,
+)
 
 router = APIRouter()
 
 
+# archive members forwarded for analysis; anything else in a zip is skipped
+_IMAGE_EXTENSIONS = {
+    ".bmp", ".gif", ".jpeg", ".jpg", ".png", ".tif", ".tiff", ".webp",
+}  # fmt: skip
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+def _is_image_member(info: zipfile.ZipInfo) -> bool:
+    name = info.filename
+    return (
+        not info.is_dir()
+        and not name.startswith("__MACOSX/")
+        and os.path.splitext(name)[1].lower() in _IMAGE_EXTENSIONS
+    )
+
+
+def _expand_upload(name: str, data: bytes) -> List[Tuple[str, bytes]]:
+    """Return ``[(name, bytes)]`` for an image or each image of a zip archive.
+
+    Archives are checked against the entry count and uncompressed size
+    limits before anything is extracted.
+    """
+    if not zipfile.is_zipfile(io.BytesIO(data)):
+        return [(name, data)]
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        infos = archive.infolist()
+        if len(infos) > settings.image_zip_max_members:
+            raise _too_large(
+                f"at most {settings.image_zip_max_members} entries per archive"
+            )
+        members = [info for info in infos if _is_image_member(info)]
+        _check_batch_size(len(members))
+        limit = settings.image_zip_max_member_bytes
+        for info in members:
+            if info.file_size > limit:
+                raise _too_large(f"{info.filename} exceeds {limit} bytes")
+        if sum(info.file_size for info in members) > settings.image_zip_max_bytes:
+            raise _too_large(
+                f"archive exceeds {settings.image_zip_max_bytes} bytes uncompressed"
+            )
+        images = []
+        for info in members:
+            # the declared size bounds the read, but do not rely on it
+            with archive.open(info) as member:
+                content = member.read(limit + 1)
+            if len(content) > limit:
+                raise _too_large(f"{info.filename} exceeds {limit} bytes")
+            images.append((f"{name}/{info.filename}", content))
+        return images
+
+
+def _check_batch_size(count: int) -> None:
+    if count > settings.image_batch_max_files:
+        raise _too_large(f"at most {settings.image_batch_max_files} images per batch")
+
+
 @router.post('/analyze-image', response_model=ImageResponse)
 async def analyze_image(file: UploadFile = File(...)):
     data = await file.read()
-    result = await a_analyze_image_bytes(data)
+    try:
+        result = await a_analyze_image_bytes(data)
+    except ImageQueueFull as exc:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "error",
+                "data": None,
+                "errors": str(exc),
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+            },
+        )
     return {
         "status": "success",
         "data": result,
         "errors": None,
         "timestamp": datetime.utcnow().isoformat() + "Z",
     }
+
+
+@router.post('/analyze-images')
+async def analyze_images(files: List[UploadFile] = File(...)):
+    """Analyze several images or zip archives of images.
+
+    Results are streamed as newline delimited JSON, one line per image in
+    completion order.
+    """
+    images: List[Tuple[str, bytes]] = []
+    for upload in files:
+        images.extend(_expand_upload(upload.filename or "upload", await upload.read()))
+        _check_batch_size(len(images))
+
+    async def result_gen():
+        async for name, result, error in a_analyze_image_batch(images):
+            yield json.dumps(
+                {
+                    "file": name,
+                    "status": "error" if error else "success",
+                    "data": result,
+                    "errors": error,
+                    "timestamp": datetime.utcnow().isoformat() + "Z",
+                }
+            ) + "\n"
+
+    return StreamingResponse(result_gen(), media_type="application/x-ndjson")
@@ -1,23 +1,53 @@
 from datetime import datetime
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, UploadFile, File
 from pydantic import BaseModel
 
-from ..services.integration_service import full_osint_scan
+from ..services.integration_service import (
+    extract_contacts_stream,
+    full_osint_scan,
+    scan_contacts,
+)
 
 router = APIRouter()
 
+# bytes read from an uploaded file at a time
+_CHUNK_SIZE = 1024 * 1024
+
 
 class ScanRequest(BaseModel):
     text: str
 
 
-@router.post("/integrated-scan")
-async def integrated_scan(payload: ScanRequest):
-    """Run a full OSINT scan on the provided text."""
-    result = await full_osint_scan(payload.text)
+def _envelope(result: dict) -> dict:
     return {
         "status": "success",
         "data": result,
         "errors": None,
         "timestamp": datetime.utcnow().isoformat() + "Z",
     }
+
+
+@router.post("/integrated-scan")
+async def integrated_scan(payload: ScanRequest):
+    """Run a full OSINT scan on the provided text."""
+    result = await full_osint_scan(payload.text)
+    return _envelope(result)
+
+
+@router.post("/integrated-scan/upload")
+async def integrated_scan_upload(file: UploadFile = File(...)):
+    """Run a full OSINT scan on an uploaded text file, read in chunks."""
+
+    async def chunks():
+        while chunk := await file.read(_CHUNK_SIZE):
+            yield chunk
+
+    phones, emails = await extract_contacts_stream(chunks())
+    return _envelope(await scan_contacts(phones, emails))
+
+
+@router.post("/integrated-scan/raw")
+async def integrated_scan_raw(request: Request):
+    """Run a full OSINT scan on a raw UTF-8 request body as it streams in."""
+    phones, emails = await extract_contacts_stream(request.stream())
+    return _envelope(await scan_contacts(phones, emails))
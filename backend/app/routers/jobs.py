@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+
+from ..models.job import (
+    EnrichmentParams,
+    IntegratedScanParams,
+    JobRequest,
+    JobResponse,
+    SmartLookupParams,
+)
+from ..services.job_service import SUCCEEDED, get_job, submit_job
+
+router = APIRouter()
+
+_PARAMS = {
+    "enrichment": EnrichmentParams,
+    "smart_lookup": SmartLookupParams,
+    "integrated_scan": IntegratedScanParams,
+}
+
+
+def _response(status_code: int, data=None, errors=None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "status": "error" if errors else "success",
+            "data": data,
+            "errors": errors,
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+        },
+    )
+
+
+@router.post("", response_model=JobResponse, status_code=202)
+async def create_job(payload: JobRequest):
+    """Queue a background job and return its id for polling."""
+    model = _PARAMS.get(payload.kind)
+    if model is None:
+        return _response(400, errors=f"unknown job kind {payload.kind!r}")
+    try:
+        params = model(**payload.params).dict()
+    except ValidationError as exc:
+        return _response(422, errors=str(exc))
+    job = await asyncio.to_thread(submit_job, payload.kind, params)
+    return _response(202, data=job)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def job_status(job_id: str):
+    """Return the status of a job."""
+    job = await asyncio.to_thread(get_job, job_id)
+    if job is None:
+        return _response(404, errors="job not found")
+    return _response(200, data=job)
+
+
+@router.get("/{job_id}/result", response_model=JobResponse)
+async def job_result(job_id: str):
+    """Return a finished job with its result; 202 while it is still running."""
+    job = await asyncio.to_thread(get_job, job_id, True)
+    if job is None:
+        return _response(404, errors="job not found")
+    if job["status"] == SUCCEEDED:
+        return _response(200, data=job)
+    if job["error"]:
+        return _response(200, data=job, errors=job["error"])
+    return _response(202, data=job)
@@ -2,7 +2,7 @@ from datetime import datetime
 from fastapi import APIRouter
 from pydantic import BaseModel
 
-from ..services.recursive_osint_engine import smart_osint_lookup
+from ..services.recursive_osint_engine import a_smart_osint_lookup
 from ..services.osint_service import extract_osint_footprint
 
 router = APIRouter()
@@ -15,7 +15,7 @@ class PhoneReq(BaseModel):
 @router.post("/smart-lookup")
 async def smart_lookup(payload: PhoneReq):
     """Run the recursive smart OSINT lookup."""
-    data = smart_osint_lookup(payload.phone)
+    data = await a_smart_osint_lookup(payload.phone)
     return {
         "status": "success",
         "data": data,
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Request, Query
+import csv
+import io
+import json
+import re
+from typing import List, Optional
+from fastapi import APIRouter, Request, Query, UploadFile, File, HTTPException
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi.responses import JSONResponse, StreamingResponse
 from datetime import datetime
 
+from ..core.config import settings
 from ..models.phone import (
     PhoneRequest,
+    BulkPhoneRequest,
     StandardResponse,
     EnrichedResponse,
 )
-from ..services.phone_service import multi_source_lookup, a_enrich_phone_data
+from ..services.phone_service import (
+    multi_source_lookup,
+    a_stream_lookup,
+    a_enrich_phone_data,
+    a_bulk_lookup,
+)
 from ..services.export_service import generate_export
 
 limiter = Limiter(key_func=get_remote_address)
@@ -36,6 +48,18 @@ async def analyze(request: Request, payload: PhoneRequest):
     return result
 
 
+@router.post('/analyze-stream')
+@limiter.limit("30/minute")
+async def analyze_stream(request: Request, payload: PhoneRequest):
+    """Stream each source's result as NDJSON, ending with the merged result."""
+
+    async def event_gen():
+        async for event in a_stream_lookup(payload.phone_number):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(event_gen(), media_type="application/x-ndjson")
+
+
 @router.post('/enrich', response_model=EnrichedResponse)
 @limiter.limit("30/minute")
 async def enrich(request: Request, payload: PhoneRequest):
@@ -52,3 +76,93 @@ async def export(request: Request, payload: PhoneRequest, fmt: str = Query("json
     if isinstance(resp, StreamingResponse):
         resp.headers["Content-Disposition"] = f"attachment; filename=report.{fmt}"
     return resp
+
+
+# header names of phone columns in call-record exports; a bare "number" only
+# counts on its own or after a call party, so "case number" is not a phone
+_PHONE_WORD = re.compile(
+    r"\b(?:phone|telephone|tel|mobile|cellphone|msisdn"
+    r"|caller|callee|called|calling|dialed|dialled)\b",
+    re.I,
+)
+_PARTY_NUMBER = re.compile(
+    r"^(?:number|(?:from|to|a|b|source|destination|other|remote)"
+    r"\s*(?:number|num|no\.?))$",
+    re.I,
+)
+
+
+def _is_phone_header(cell: str) -> bool:
+    # split snake_case, kebab-case and camelCase names into words
+    words = re.sub(r"(?<=[a-z])(?=[A-Z])|[_\-]+", " ", cell).strip()
+    return bool(_PHONE_WORD.search(words) or _PARTY_NUMBER.match(words))
+
+
+def _numbers_from_csv(text: str, column: Optional[str] = None) -> List[str]:
+    """Return the phone numbers of a CSV export.
+
+    ``column`` selects a column by header name or zero-based index. Without
+    it, every column whose header looks like a phone number field is used,
+    or the first column when there is no such header.
+    """
+    rows = [row for row in csv.reader(io.StringIO(text)) if row]
+    if not rows:
+        return []
+    header = [cell.strip() for cell in rows[0]]
+    if column is not None:
+        if column in header:
+            indexes, rows = [header.index(column)], rows[1:]
+        elif column.isdigit():
+            indexes = [int(column)]
+            first = header[indexes[0]] if indexes[0] < len(header) else ""
+            # a header row has no digits in the phone column
+            if _is_phone_header(first) or not any(c.isdigit() for c in first):
+                rows = rows[1:]
+        else:
+            raise HTTPException(status_code=400, detail=f"unknown column {column!r}")
+    else:
+        indexes = [i for i, cell in enumerate(header) if _is_phone_header(cell)]
+        if indexes:
+            rows = rows[1:]
+        else:
+            indexes = [0]
+    return [
+        row[i].strip()
+        for row in rows
+        for i in indexes
+        if i < len(row) and row[i].strip()
+    ]
+
+
+def _bulk_response(numbers: List[str], region: Optional[str]) -> StreamingResponse:
+    if len(numbers) > settings.bulk_max_numbers:
+        raise HTTPException(
+            status_code=413,
+            detail=f"at most {settings.bulk_max_numbers} numbers per request",
+        )
+
+    async def result_gen():
+        async for item in a_bulk_lookup(numbers, region):
+            yield json.dumps(item) + "\n"
+
+    return StreamingResponse(result_gen(), media_type="application/x-ndjson")
+
+
+@router.post('/analyze-bulk')
+@limiter.limit("5/minute")
+async def analyze_bulk(request: Request, payload: BulkPhoneRequest):
+    """Analyze a list of numbers, streaming one NDJSON line per number."""
+    return _bulk_response(payload.phone_numbers, payload.region)
+
+
+@router.post('/analyze-bulk/upload')
+@limiter.limit("5/minute")
+async def analyze_bulk_upload(
+    request: Request,
+    file: UploadFile = File(...),
+    column: Optional[str] = Query(None),
+    region: Optional[str] = Query(None),
+):
+    """Analyze the numbers of an uploaded CSV, streaming NDJSON results."""
+    text = (await file.read()).decode("utf-8-sig", errors="replace")
+    return _bulk_response(_numbers_from_csv(text, column), region)
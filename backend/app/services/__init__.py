@@ -5,7 +5,7 @@ from .phone_service import (
     a_enrich_phone_data,
 )
 from .osint_service import extract_osint_footprint
-from .recursive_osint_engine import smart_osint_lookup
+from .recursive_osint_engine import smart_osint_lookup, a_smart_osint_lookup
 from .identity_enrichment_service import enrich_identity
 from .geosocial_service import extract_footprint
 from .phone_social_discovery import discover_social_accounts
@@ -17,6 +17,7 @@ __all__ = [
     'a_enrich_phone_data',
     'extract_osint_footprint',
     'smart_osint_lookup',
+    'a_smart_osint_lookup',
     'enrich_identity',
     'extract_footprint',
     'discover_social_accounts',
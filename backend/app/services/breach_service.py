@@ -1,30 +1,166 @@
-import requests
-from typing import List
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from ..core.circuit_breaker import CircuitOpenError, a_guarded_get, guarded_get
+from ..core.config import settings
+from ..core.metrics import BREACH_FETCH_LATENCY
+from ..core.singleflight import SingleFlight
+from ..core.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# raw source responses keyed by (source, type, query); each consumer projects
+# the field it needs so one scylla/dehashed round trip serves all of them
+_SOURCE_CACHE = TTLCache(
+    maxsize=settings.breach_cache_size,
+    ttl=settings.breach_cache_ttl,
+    name="breach_sources",
+)
+# async fetches in progress, so concurrent coroutines share one request
+_FLIGHTS = SingleFlight()
+# base delay between attempts of a failed fetch, growing linearly
+_RETRY_DELAY = 1.0
+
+
+def _json_body(r) -> Optional[Dict]:
+    if r.status_code == 200:
+        data = r.json()
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def _get_json(url: str, source: str) -> Optional[Dict]:
+    """Return the decoded JSON body for a successful GET or ``None``.
+
+    Returns ``None`` straight away while the source's breaker is open.
+    """
+    start, outcome = time.perf_counter(), "error"
+    try:
+        r = guarded_get(source, url)
+        outcome = str(r.status_code)
+        return _json_body(r)
+    except CircuitOpenError as exc:
+        outcome = None
+        logger.debug("skipping %s: %s", url, exc)
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("request failed for %s: %s", url, exc)
+    finally:
+        if outcome is not None:
+            BREACH_FETCH_LATENCY.observe(
+                time.perf_counter() - start, source=source, outcome=outcome
+            )
+    return None
+
+
+async def _a_get_json(url: str, source: str) -> Optional[Dict]:
+    """Async variant of :func:`_get_json` using the shared HTTP client.
+
+    Raises :class:`CircuitOpenError` while the source's breaker is open.
+    """
+    start, outcome = time.perf_counter(), "error"
+    try:
+        r = await a_guarded_get(source, url)
+        outcome = str(r.status_code)
+        return _json_body(r)
+    except CircuitOpenError:
+        outcome = None
+        raise
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("request failed for %s: %s", url, exc)
+    finally:
+        if outcome is not None:
+            BREACH_FETCH_LATENCY.observe(
+                time.perf_counter() - start, source=source, outcome=outcome
+            )
+    return None
+
+
+async def _a_cached_json(key: tuple, url: str, attempts: int = 1) -> Optional[Dict]:
+    """Return the cached response for ``key`` or fetch it once.
+
+    A failed fetch is tried up to ``attempts`` times with a growing delay.
+    """
+    data = _SOURCE_CACHE.get(key)
+    if data is not None:
+        return data
+
+    async def fetch() -> Optional[Dict]:
+        for attempt in range(1, attempts + 1):
+            data = await _a_get_json(url, key[0])
+            if data is not None:
+                _SOURCE_CACHE.set(key, data)
+                return data
+            if attempt < attempts:
+                await asyncio.sleep(_RETRY_DELAY * attempt)
+        return None
+
+    return await _FLIGHTS.do(key, fetch)
+
+
+def scylla_rows(query: str, qtype: str = "email") -> List[Dict]:
+    """Return raw scylla.sh rows for ``query``, cached per query and type."""
+    url = f"https://scylla.sh/search?q={query}&type={qtype}"
+    data = _SOURCE_CACHE.get_or_set(
+        ("scylla", qtype, query), lambda: _get_json(url, "scylla")
+    )
+    return data.get("data", []) if data else []
+
+
+def dehashed_entries(query: str) -> List[Dict]:
+    """Return raw dehashed entries for ``query``, cached per query."""
+    url = f"https://api.dehashed.com/search?query={query}"
+    data = _SOURCE_CACHE.get_or_set(
+        ("dehashed", query), lambda: _get_json(url, "dehashed")
+    )
+    return data.get("entries", []) if data else []
+
+
+def _project(rows: List[Dict], field: str) -> List[str]:
+    """Return unique non-empty values of ``field`` in row order."""
+    return list(dict.fromkeys(row.get(field) for row in rows if row.get(field)))
 
 
 def scylla_lookup(query: str, qtype: str = "email") -> List[str]:
     """Query scylla.sh for breach records related to an email or phone."""
-    url = f"https://scylla.sh/search?q={query}&type={qtype}"
-    try:
-        r = requests.get(url, timeout=10)
-        if r.status_code == 200:
-            data = r.json()
-            breaches = [row.get("source") for row in data.get("data", []) if row.get("source")]
-            return list(dict.fromkeys(breaches))
-    except Exception:
-        pass
-    return []
+    return _project(scylla_rows(query, qtype), "source")
 
 
 def dehashed_lookup(query: str) -> List[str]:
     """Query the public dehashed API for breach exposures."""
+    return _project(dehashed_entries(query), "source")
+
+
+async def a_scylla_rows(
+    query: str, qtype: str = "email", attempts: int = 1
+) -> List[Dict]:
+    """Async variant of :func:`scylla_rows`.
+
+    A failed request is tried up to ``attempts`` times. Raises
+    :class:`CircuitOpenError` while scylla.sh is failing.
+    """
+    url = f"https://scylla.sh/search?q={query}&type={qtype}"
+    data = await _a_cached_json(("scylla", qtype, query), url, attempts)
+    return data.get("data", []) if data else []
+
+
+async def a_dehashed_entries(query: str) -> List[Dict]:
+    """Async variant of :func:`dehashed_entries`.
+
+    Raises :class:`CircuitOpenError` while dehashed is failing.
+    """
     url = f"https://api.dehashed.com/search?query={query}"
-    try:
-        r = requests.get(url, timeout=10)
-        if r.status_code == 200:
-            data = r.json()
-            breaches = [r.get("source") for r in data.get("entries", []) if r.get("source")]
-            return list(dict.fromkeys(breaches))
-    except Exception:
-        pass
-    return []
+    data = await _a_cached_json(("dehashed", query), url)
+    return data.get("entries", []) if data else []
+
+
+async def a_scylla_lookup(query: str, qtype: str = "email") -> List[str]:
+    """Async variant of :func:`scylla_lookup`."""
+    return _project(await a_scylla_rows(query, qtype), "source")
+
+
+async def a_dehashed_lookup(query: str) -> List[str]:
+    """Async variant of :func:`dehashed_lookup`."""
+    return _project(await a_dehashed_entries(query), "source")
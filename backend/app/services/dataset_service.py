@@ -0,0 +1,139 @@
+"""Indexed in-memory access to the local OSINT dataset.
+
+The dataset file (``settings.dataset_path``) is parsed once and kept in hash
+indexes keyed by phone number, email, account, username and connection so
+lookups do not rescan or reload the file. The file is reloaded transparently
+when its modification time or size changes.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _account_username(account: str) -> Optional[str]:
+    """Return the username part of a ``platform:username`` account string."""
+    if ":" not in account:
+        return None
+    return account.split(":", 1)[1]
+
+
+class Dataset:
+    """Lazily loaded dataset with hash indexes and reload on file change."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._entries: List[Dict] = []
+        self._by_phone: Dict[str, List[Dict]] = {}
+        self._by_email: Dict[str, List[str]] = {}
+        self._by_account: Dict[str, List[str]] = {}
+        self._by_username: Dict[str, List[str]] = {}
+        self._by_connection: Dict[str, List[str]] = {}
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self) -> None:
+        """Reload and reindex the dataset if the file changed on disk."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            entries: List[Dict] = []
+            if stamp is not None:
+                try:
+                    with open(self.path) as f:
+                        entries = json.load(f)
+                except Exception as exc:  # noqa: BLE001
+                    logger.error("failed to load dataset %s: %s", self.path, exc)
+                    entries = []
+            self._build(entries)
+            self._stamp = stamp
+
+    def _build(self, entries: List[Dict]) -> None:
+        by_phone: Dict[str, List[Dict]] = {}
+        by_email: Dict[str, List[str]] = {}
+        by_account: Dict[str, List[str]] = {}
+        by_username: Dict[str, List[str]] = {}
+        by_connection: Dict[str, List[str]] = {}
+        for entry in entries:
+            phone = entry.get("phone_number")
+            by_phone.setdefault(phone, []).append(entry)
+            email = entry.get("email")
+            if email:
+                by_email.setdefault(email, []).append(phone)
+            for acct in entry.get("accounts", []):
+                by_account.setdefault(acct, []).append(phone)
+                uname = _account_username(acct)
+                if uname:
+                    by_username.setdefault(uname, []).append(phone)
+            for conn in entry.get("connections", []):
+                by_connection.setdefault(conn, []).append(phone)
+        self._entries = entries
+        self._by_phone = by_phone
+        self._by_email = by_email
+        self._by_account = by_account
+        self._by_username = by_username
+        self._by_connection = by_connection
+
+    def entries(self) -> List[Dict]:
+        """Return all dataset entries."""
+        self._refresh()
+        return self._entries
+
+    def entries_for_phone(self, phone: str) -> List[Dict]:
+        """Return every entry recorded for ``phone``."""
+        self._refresh()
+        return list(self._by_phone.get(phone, []))
+
+    def entry(self, phone: str) -> Optional[Dict]:
+        """Return the first entry recorded for ``phone`` if any."""
+        self._refresh()
+        entries = self._by_phone.get(phone)
+        return entries[0] if entries else None
+
+    def emails_for_phone(self, phone: str) -> List[str]:
+        """Return emails linked to ``phone`` in dataset order."""
+        return [e["email"] for e in self.entries_for_phone(phone) if e.get("email")]
+
+    def phones_for_email(self, email: str) -> List[str]:
+        """Return phone numbers sharing ``email``."""
+        self._refresh()
+        return list(self._by_email.get(email, []))
+
+    def phones_for_account(self, account: str) -> List[str]:
+        """Return phone numbers listing the exact ``account`` string."""
+        self._refresh()
+        return list(self._by_account.get(account, []))
+
+    def phones_for_username(self, username: str) -> List[str]:
+        """Return phone numbers with an account using ``username``."""
+        self._refresh()
+        return list(self._by_username.get(username, []))
+
+    def phones_connected_to(self, phone: str) -> List[str]:
+        """Return phone numbers listing ``phone`` among their connections."""
+        self._refresh()
+        return list(self._by_connection.get(phone, []))
+
+
+_DATASET = Dataset(settings.dataset_path)
+
+
+def get_dataset() -> Dataset:
+    """Return the shared dataset instance."""
+    return _DATASET
@@ -14,9 +14,10 @@ from .phone_service import (
     _fetch_avatar,
     _calculate_confidence,
 )
-from .social_service import run_maigret, run_sherlock
+from .social_service import a_run_maigret, a_run_sherlock
 from .relationship_service import build_relationship_map
 from .image_service import a_analyze_image_bytes
+from ..core.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -48,13 +49,10 @@ async def _discover_emails(number: str) -> List[str]:
 
 async def _collect_accounts(number: str, emails: List[str]) -> List[Dict]:
     """Find social media accounts using Maigret and Sherlock."""
-    tasks = [
-        asyncio.to_thread(run_maigret, number),
-        asyncio.to_thread(run_sherlock, number),
-    ]
+    tasks = [a_run_maigret(number), a_run_sherlock(number)]
     for em in emails:
-        tasks.append(asyncio.to_thread(run_maigret, em))
-        tasks.append(asyncio.to_thread(run_sherlock, em))
+        tasks.append(a_run_maigret(em))
+        tasks.append(a_run_sherlock(em))
     results = await asyncio.gather(*tasks)
     accounts = []
     for arr in results:
@@ -76,7 +74,7 @@ async def _process_profile(client: httpx.AsyncClient, profile: Dict) -> Dict:
     analysis = None
     if avatar_url:
         try:
-            resp = await client.get(avatar_url, timeout=10)
+            resp = await client.get(avatar_url, follow_redirects=True)
             if resp.status_code == 200:
                 analysis = await a_analyze_image_bytes(resp.content)
         except Exception as exc:  # noqa: BLE001
@@ -112,9 +110,9 @@ async def run_enrichment(
     accounts = await _run_with_retries(lambda: _collect_accounts(phone_number, emails))
     update("accounts", accounts)
 
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        tasks = [asyncio.create_task(_process_profile(client, p)) for p in accounts]
-        profiles = await asyncio.gather(*tasks)
+    client = get_http_client()
+    tasks = [asyncio.create_task(_process_profile(client, p)) for p in accounts]
+    profiles = await asyncio.gather(*tasks)
     update("profiles", profiles)
 
     phone_breaches, email_breach_lists = await asyncio.gather(
@@ -1,13 +1,15 @@
-import asyncio
 import json
-import subprocess
 from typing import Dict
 import logging
 
+from ..core.singleflight import single_flight
+from ..core.subprocess_pool import run_tool
+
 _CACHE: Dict[str, dict] = {}
 logger = logging.getLogger(__name__)
 
 
+@single_flight
 async def extract_footprint(username: str) -> Dict:
     """Run GeoSocial Footprint CLI and return parsed JSON."""
     if username in _CACHE:
@@ -15,8 +17,9 @@ async def extract_footprint(username: str) -> Dict:
 
     cmd = ["geosocial-footprint", "--user", username, "--json"]
     try:
-        output = await asyncio.to_thread(subprocess.check_output, cmd, text=True)
-        data = json.loads(output)
+        proc = await run_tool("geosocial-footprint", cmd)
+        proc.check_returncode()
+        data = json.loads(proc.stdout)
     except FileNotFoundError:
         logger.error("GeoSocial Footprint CLI not found. Install geosocial-footprint")
         raise RuntimeError("GeoSocial Footprint CLI missing")
@@ -0,0 +1,129 @@
+"""Streaming extraction of profile images from HTML pages.
+
+Profile pages are often a megabyte or more, but the og:image/twitter:image
+meta tags live in ``<head>`` and the fallback is the first ``<img>``. Pages
+are therefore streamed and the download stops as soon as the part we need
+has arrived; the truncated document is parsed with lxml (falling back to
+``html.parser``) in a worker thread so the event loop is never blocked.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Dict, List, Optional
+
+import httpx
+from bs4 import BeautifulSoup
+
+from ..core.config import settings
+
+try:
+    import lxml  # noqa: F401
+
+    PARSER = "lxml"
+except ImportError:  # pragma: no cover - optional dependency
+    PARSER = "html.parser"
+
+logger = logging.getLogger(__name__)
+
+_HEAD_END = re.compile(rb"</head\s*>", re.I)
+_IMG_START = re.compile(rb"<img\b", re.I)
+# a complete <img ...> tag; quoted attribute values may contain ">"
+_IMG_TAG = re.compile(rb"<img\b(?:[^>\"']|\"[^\"]*\"|'[^']*')*>", re.I)
+_SRC_ATTR = re.compile(rb"""\ssrc\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+_META_IMAGE = re.compile(rb"og:image|twitter:image", re.I)
+
+
+def _is_listed(src: str) -> bool:
+    """Return True for the ``<img>`` sources :func:`parse_images` reports."""
+    return src.startswith("http")
+
+
+class _StopScanner:
+    """Incrementally decide when enough of a page has been downloaded.
+
+    Only complete ``<img>`` tags are counted, and only those whose ``src``
+    :func:`parse_images` would report count towards ``max_images``.
+    """
+
+    def __init__(self, max_images: int) -> None:
+        self.max_images = max_images
+        self.images = 0
+        self._img_pos = 0
+        self._head_pos = 0
+
+    def _scan_images(self, buf: bytes) -> None:
+        for match in _IMG_TAG.finditer(buf, self._img_pos):
+            self._img_pos = match.end()
+            src = _SRC_ATTR.search(match.group())
+            value = b"".join(g or b"" for g in src.groups()) if src else b""
+            if _is_listed(value.decode("latin-1")):
+                self.images += 1
+        # resume at a tag that has started but not yet arrived in full
+        partial = _IMG_START.search(buf, self._img_pos)
+        self._img_pos = partial.start() if partial else max(self._img_pos, len(buf) - 4)
+
+    def feed(self, buf: bytes) -> bool:
+        """Return True once ``buf`` holds what :func:`parse_images` needs."""
+        self._scan_images(buf)
+        if self.images >= self.max_images:
+            return True
+        if self.max_images > 1:
+            return False
+        head_end = _HEAD_END.search(buf, self._head_pos)
+        self._head_pos = max(self._head_pos, len(buf) - 8)
+        # a head without image meta tags still needs the first <img>
+        return bool(head_end and _META_IMAGE.search(buf, 0, head_end.start()))
+
+
+def parse_images(html: str, max_images: int = 1) -> Dict:
+    """Return the profile image and up to ``max_images`` absolute image URLs."""
+    soup = BeautifulSoup(html, PARSER)
+    image = None
+    meta = soup.find("meta", property="og:image") or soup.find(
+        "meta", attrs={"name": "twitter:image"}
+    )
+    if meta and meta.get("content"):
+        image = meta["content"]
+    images: List[str] = []
+    for img in soup.find_all("img"):
+        src = img.get("src")
+        if not src:
+            continue
+        if image is None:
+            image = src
+        if _is_listed(src):
+            images.append(src)
+        if len(images) >= max_images:
+            break
+    return {"image": image, "images": images}
+
+
+async def fetch_page_images(
+    client: httpx.AsyncClient, url: str, max_images: int = 1
+) -> Optional[Dict]:
+    """Stream ``url`` and return its final URL and images.
+
+    The result has ``url``, ``image`` (og:image, twitter:image or the first
+    ``<img>``) and ``images`` (up to ``max_images`` absolute ``<img>`` URLs).
+    Returns ``None`` when the page cannot be fetched or is not a 200.
+    """
+    try:
+        async with client.stream("GET", url, follow_redirects=True) as resp:
+            if resp.status_code != 200:
+                return None
+            scanner = _StopScanner(max_images)
+            buf = bytearray()
+            async for chunk in resp.aiter_bytes():
+                buf += chunk
+                if len(buf) >= settings.html_max_bytes or scanner.feed(buf):
+                    break
+            final_url = str(resp.url)
+            encoding = resp.encoding or "utf-8"
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("fetch failed for %s: %s", url, exc)
+        return None
+    html = buf[: settings.html_max_bytes].decode(encoding, errors="replace")
+    result = await asyncio.to_thread(parse_images, html, max_images)
+    result["url"] = final_url
+    return result
@@ -5,22 +5,21 @@ import re
 from typing import Dict, List, Optional
 
 import httpx
-from bs4 import BeautifulSoup
+
+from ..core.http import get_http_client
+from ..core.singleflight import single_flight
+from .html_service import fetch_page_images
 
 # simple in-memory cache
 _CACHE: Dict[str, dict] = {}
 
-# concurrency limit for HTTP requests
-_SEMAPHORE = asyncio.Semaphore(5)
-
 logger = logging.getLogger(__name__)
 
 
 async def _fetch(client: httpx.AsyncClient, url: str) -> Optional[httpx.Response]:
     """Fetch a URL with basic error handling."""
     try:
-        async with _SEMAPHORE:
-            resp = await client.get(url, timeout=10, follow_redirects=True)
+        resp = await client.get(url, follow_redirects=True)
         if resp.status_code == 200:
             return resp
     except Exception as exc:  # noqa: BLE001
@@ -28,31 +27,16 @@ async def _fetch(client: httpx.AsyncClient, url: str) -> Optional[httpx.Response
     return None
 
 
-def _extract_og_image(html: str) -> Optional[str]:
-    """Return open graph image URL from HTML if present."""
-    soup = BeautifulSoup(html, "html.parser")
-    meta = soup.find("meta", property="og:image") or soup.find(
-        "meta", attrs={"name": "twitter:image"}
-    )
-    if meta and meta.get("content"):
-        return meta["content"]
-    img = soup.find("img")
-    if img and img.get("src"):
-        return img["src"]
-    return None
-
-
 async def _check_social(client: httpx.AsyncClient, platform: str, url: str, username: str) -> Optional[Dict]:
     """Check if a social profile exists and return details."""
-    resp = await _fetch(client, url)
-    if not resp:
+    page = await fetch_page_images(client, url)
+    if not page:
         return None
-    img = _extract_og_image(resp.text)
     return {
         "platform": platform,
         "username": username,
-        "url": str(resp.url),
-        "avatar": img,
+        "url": page["url"],
+        "avatar": page["image"],
     }
 
 
@@ -73,8 +57,7 @@ async def _gmail_exists(client: httpx.AsyncClient, email: str) -> bool:
         return False
     url = f"https://mail.google.com/mail/gxlu?email={email}"
     try:
-        async with _SEMAPHORE:
-            resp = await client.get(url, timeout=10, follow_redirects=False)
+        resp = await client.get(url, follow_redirects=False)
         return resp.status_code == 302 and "set-cookie" in resp.headers
     except Exception as exc:  # noqa: BLE001
         logger.debug("gmail check failed: %s", exc)
@@ -107,6 +90,7 @@ def _generate_usernames(identifier: str) -> List[str]:
     return [joined, "_".join(parts), ".".join(parts)]
 
 
+@single_flight
 async def enrich_identity(identifier: str) -> Dict:
     """Return publicly available social and email info for the identifier."""
     if identifier in _CACHE:
@@ -122,41 +106,41 @@ async def enrich_identity(identifier: str) -> Dict:
         "profile_images": [],
     }
 
-    async with httpx.AsyncClient() as client:
-        tasks = []
-        if "@" in identifier:
-            tasks.append(asyncio.create_task(_gravatar_url(client, identifier)))
-            tasks.append(asyncio.create_task(_gmail_exists(client, identifier)))
-            tasks.append(asyncio.create_task(_emailrep_lookup(client, identifier)))
-        social_tasks = []
-        platforms = {
-            "Facebook": "https://www.facebook.com/{username}",
-            "Instagram": "https://www.instagram.com/{username}",
-            "TikTok": "https://www.tiktok.com/@{username}",
-            "Twitter": "https://twitter.com/{username}",
-        }
-        for uname in usernames:
-            for platform, tmpl in platforms.items():
-                url = tmpl.format(username=uname)
-                social_tasks.append(
-                    asyncio.create_task(_check_social(client, platform, url, uname))
-                )
-        social_results = await asyncio.gather(*social_tasks)
-        social_accounts = [r for r in social_results if r]
-        result["social_accounts"] = [
-            {"platform": r["platform"], "url": r["url"], "username": r["username"]}
-            for r in social_accounts
-        ]
-        images = [r["avatar"] for r in social_accounts if r.get("avatar")]
-
-        if tasks:
-            gravatar, gmail, emailrep = await asyncio.gather(*tasks)
-            result["gravatar"] = gravatar
-            result["gmail"] = bool(gmail)
-            result["emailrep"] = emailrep
-            if gravatar:
-                images.append(gravatar)
-        result["profile_images"] = images
+    client = get_http_client()
+    tasks = []
+    if "@" in identifier:
+        tasks.append(asyncio.create_task(_gravatar_url(client, identifier)))
+        tasks.append(asyncio.create_task(_gmail_exists(client, identifier)))
+        tasks.append(asyncio.create_task(_emailrep_lookup(client, identifier)))
+    social_tasks = []
+    platforms = {
+        "Facebook": "https://www.facebook.com/{username}",
+        "Instagram": "https://www.instagram.com/{username}",
+        "TikTok": "https://www.tiktok.com/@{username}",
+        "Twitter": "https://twitter.com/{username}",
+    }
+    for uname in usernames:
+        for platform, tmpl in platforms.items():
+            url = tmpl.format(username=uname)
+            social_tasks.append(
+                asyncio.create_task(_check_social(client, platform, url, uname))
+            )
+    social_results = await asyncio.gather(*social_tasks)
+    social_accounts = [r for r in social_results if r]
+    result["social_accounts"] = [
+        {"platform": r["platform"], "url": r["url"], "username": r["username"]}
+        for r in social_accounts
+    ]
+    images = [r["avatar"] for r in social_accounts if r.get("avatar")]
+
+    if tasks:
+        gravatar, gmail, emailrep = await asyncio.gather(*tasks)
+        result["gravatar"] = gravatar
+        result["gmail"] = bool(gmail)
+        result["emailrep"] = emailrep
+        if gravatar:
+            images.append(gravatar)
+    result["profile_images"] = images
 
     _CACHE[identifier] = result
     return result
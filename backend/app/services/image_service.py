@@ -1,10 +1,95 @@
+import asyncio
+import copy
+import hashlib
 import io
-from typing import Dict, Optional
+import logging
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
 from PIL import Image
 import numpy as np
 import pytesseract
 import piexif
 
+from ..core.cache import ResultCache
+from ..core.config import settings
+from ..core.metrics import IMAGE_ANALYSIS_LATENCY
+from ..core.singleflight import SingleFlight
+from ..core.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# optional detectors, imported once per process by _load_models()
+_face_recognition = None
+_cv = None
+_models_loaded = False
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# analyses running or waiting in this process, bounded by settings; callers
+# may run on different threads and event loops, so it sits behind a lock
+_pending = 0
+_pending_lock = threading.Lock()
+
+# analysis results keyed by the SHA-256 of the image bytes: a per-process
+# memory tier in front of the shared SQLite tier
+_MEMORY_CACHE = TTLCache(
+    maxsize=settings.image_cache_size,
+    ttl=settings.image_cache_ttl,
+    name="image_analysis_memory",
+)
+_DISK_CACHE = ResultCache(
+    "image_analysis",
+    ttl=settings.image_cache_ttl,
+    max_bytes=settings.image_cache_max_bytes,
+)
+_FLIGHTS = SingleFlight()
+
+
+class ImageQueueFull(RuntimeError):
+    """Raised when the image analysis queue is at capacity."""
+
+
+def _load_models() -> None:
+    """Import the optional face and object detectors once per process."""
+    global _face_recognition, _cv, _models_loaded
+    if _models_loaded:
+        return
+    try:
+        import face_recognition
+    except Exception:  # noqa: BLE001
+        face_recognition = None
+    try:
+        import cvlib as cv
+    except Exception:  # noqa: BLE001
+        cv = None
+    _face_recognition, _cv = face_recognition, cv
+    _models_loaded = True
+
+
+def _warm_worker() -> None:
+    """Pool initializer: load dlib, cvlib (with YOLO weights) and tesseract."""
+    _load_models()
+    blank = np.zeros((64, 64, 3), dtype=np.uint8)
+    if _face_recognition:
+        _face_recognition.face_locations(blank)
+    if _cv:
+        try:
+            _cv.detect_common_objects(blank, confidence=0.25, model="yolov3-tiny")
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("YOLO warm-up failed: %s", exc)
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("tesseract unavailable: %s", exc)
+
 
 def _extract_exif(img: Image.Image) -> Dict[str, str]:
     try:
@@ -36,45 +121,344 @@ def _infer_platform(text: str) -> Optional[str]:
     return None
 
 
+# bump when the analysis output changes so stale cached results are not served
+_ANALYSIS_VERSION = "2"
+
+
+def _content_key(data: bytes) -> str:
+    return f"v{_ANALYSIS_VERSION}:{hashlib.sha256(data).hexdigest()}"
+
+
+def _memory_lookup(key: str) -> Optional[Dict]:
+    result = _MEMORY_CACHE.get(key)
+    return copy.deepcopy(result) if result is not None else None
+
+
+def _disk_lookup(key: str) -> Optional[Dict]:
+    result = _DISK_CACHE.get(key)
+    if result is not None:
+        _MEMORY_CACHE.set(key, result)
+        return copy.deepcopy(result)
+    return None
+
+
+def _store(key: str, result: Dict) -> None:
+    _MEMORY_CACHE.set(key, result)
+    _DISK_CACHE.set(key, result)
+
+
 def analyze_image_bytes(data: bytes) -> Dict:
-    try:
-        import face_recognition
-    except Exception:  # noqa: BLE001
-        face_recognition = None
-    try:
-        import cvlib as cv
-    except Exception:  # noqa: BLE001
-        cv = None
+    """Return analysis for ``data``, reusing results for identical bytes."""
+    key = _content_key(data)
+    cached = _memory_lookup(key) or _disk_lookup(key)
+    if cached is not None:
+        return cached
+    result = _analyze_image_bytes(data)
+    _store(key, result)
+    return copy.deepcopy(result)
+
+
+def _fit(width: int, height: int, max_pixels: int) -> Tuple[int, int]:
+    """Return ``(width, height)`` scaled down to at most ``max_pixels``."""
+    if max_pixels <= 0 or width * height <= max_pixels:
+        return width, height
+    scale = math.sqrt(max_pixels / (width * height))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def _downscale(img: Image.Image, max_pixels: int) -> Image.Image:
+    size = _fit(img.width, img.height, max_pixels)
+    if size == img.size:
+        return img
+    return img.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+
+def _decode(img: Image.Image) -> Image.Image:
+    """Decode ``img`` as RGB, at reduced scale for JPEGs over the OCR budget.
 
+    JPEG draft mode lets the decoder skip DCT coefficients, so a large photo
+    is never fully materialized in memory.
+    """
+    target = _fit(img.width, img.height, settings.image_ocr_max_pixels)
+    if img.format == "JPEG" and target != img.size:
+        img.draft("RGB", target)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return img
+
+
+def _prepare(data: bytes) -> Tuple[Dict, np.ndarray, float, float]:
+    """Decode ``data``, run OCR and return the detection input.
+
+    Returns the partial result, the downscaled RGB array for detection and the
+    x/y factors mapping detection coordinates back to the original size.
+    """
     img = Image.open(io.BytesIO(data))
     width, height = img.size
     fmt = img.format or "unknown"
 
     exif = _extract_exif(img)
-    text = pytesseract.image_to_string(img)
+    img = _decode(img)
 
-    arr = np.array(img.convert("RGB"))
+    ocr_img = _downscale(img, settings.image_ocr_max_pixels)
+    text = pytesseract.image_to_string(ocr_img.convert("L"))
+
+    det_img = _downscale(img, settings.image_detect_max_pixels)
+    result = {
+        "dimensions": f"{width}x{height}",
+        "format": fmt,
+        "text": text.strip(),
+        "exif": exif or None,
+        "inferred_platform": _infer_platform(text),
+    }
+    return result, np.asarray(det_img), width / det_img.width, height / det_img.height
+
+
+def _detect(arr: np.ndarray, sx: float, sy: float) -> Dict:
+    """Run face and object detection on ``arr``, scaling boxes by ``sx``/``sy``."""
+    face_recognition, cv = _face_recognition, _cv
     faces = face_recognition.face_locations(arr) if face_recognition else []
+    face_locations = [
+        [round(top * sy), round(right * sx), round(bottom * sy), round(left * sx)]
+        for top, right, bottom, left in faces
+    ]
+    objects: List[str] = []
+    object_boxes = []
     if cv:
-        bbox, labels, _ = cv.detect_common_objects(
+        bbox, labels, confidences = cv.detect_common_objects(
             arr, confidence=0.25, model="yolov3-tiny"
         )
         objects = list(set(labels))
-    else:
-        objects = []
-
-    platform = _infer_platform(text)
+        for (x1, y1, x2, y2), label, conf in zip(bbox, labels, confidences):
+            object_boxes.append(
+                {
+                    "label": label,
+                    "confidence": round(float(conf), 3),
+                    "box": [
+                        round(x1 * sx),
+                        round(y1 * sy),
+                        round(x2 * sx),
+                        round(y2 * sy),
+                    ],
+                }
+            )
     return {
-        "dimensions": f"{width}x{height}",
-        "format": fmt,
-        "text": text.strip(),
         "faces_detected": len(faces),
+        "face_locations": face_locations,
         "objects": objects,
-        "exif": exif or None,
-        "inferred_platform": platform,
+        "object_boxes": object_boxes,
     }
 
 
+def _analyze_image_bytes(data: bytes) -> Dict:
+    _load_models()
+    result, arr, sx, sy = _prepare(data)
+    result.update(_detect(arr, sx, sy))
+    return result
+
+
+def _error_text(exc: Exception) -> str:
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _analyze_batch(images: List[bytes]) -> List[Dict]:
+    """Analyze a chunk of images in one worker call.
+
+    All images are decoded and OCR'd first, then detection runs over the
+    whole chunk back to back with the models hot. Each outcome is either
+    ``{"result": ...}`` or ``{"error": ...}`` so one bad file does not fail
+    the chunk.
+    """
+    _load_models()
+    prepared: List[Optional[Tuple[Dict, np.ndarray, float, float]]] = []
+    outcomes: List[Dict] = []
+    for data in images:
+        try:
+            prepared.append(_prepare(data))
+            outcomes.append({})
+        except Exception as exc:  # noqa: BLE001
+            prepared.append(None)
+            outcomes.append({"error": _error_text(exc)})
+    for item, outcome in zip(prepared, outcomes):
+        if item is None:
+            continue
+        result, arr, sx, sy = item
+        try:
+            result.update(_detect(arr, sx, sy))
+            outcome["result"] = result
+        except Exception as exc:  # noqa: BLE001
+            outcome["error"] = _error_text(exc)
+    return outcomes
+
+
+def _noop() -> None:
+    return None
+
+
+def _analyze_in_worker(data: bytes) -> Dict:
+    """Pool entry point; errors are re-raised as plain RuntimeError.
+
+    Some library exceptions (e.g. pytesseract's) cannot be unpickled and
+    would otherwise break the whole pool.
+    """
+    try:
+        return _analyze_image_bytes(data)
+    except Exception as exc:  # noqa: BLE001
+        raise RuntimeError(_error_text(exc)) from None
+
+
+def get_image_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the analysis process pool, or ``None`` when workers are disabled."""
+    global _pool
+    if settings.image_workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.image_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return _pool
+
+
+def start_image_pool() -> None:
+    """Spawn and warm the analysis workers ahead of the first request."""
+    pool = get_image_pool()
+    if pool is not None:
+        for _ in range(settings.image_workers):
+            pool.submit(_noop)
+
+
+def shutdown_image_pool() -> None:
+    """Stop the analysis workers."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _reserve() -> None:
+    """Take a queue slot or raise :class:`ImageQueueFull`."""
+    global _pending
+    capacity = max(settings.image_workers, 1) + settings.image_queue_limit
+    with _pending_lock:
+        if _pending >= capacity:
+            raise ImageQueueFull("image analysis queue is full")
+        _pending += 1
+
+
+def _release() -> None:
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+async def _submit(func: Callable[[T], R], arg: T, mode: str) -> R:
+    """Run ``func(arg)`` in the worker pool, bounded by the queue limit."""
+    _reserve()
+    start = time.perf_counter()
+    try:
+        pool = get_image_pool()
+        if pool is None:
+            return await asyncio.to_thread(func, arg)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, func, arg)
+        except BrokenProcessPool:
+            logger.error("image worker pool broke; restarting it")
+            _discard_pool(pool)
+            raise
+    finally:
+        _release()
+        IMAGE_ANALYSIS_LATENCY.observe(time.perf_counter() - start, mode=mode)
+
+
+async def _dispatch(data: bytes) -> Dict:
+    """Run an uncached analysis in the worker pool."""
+    return await _submit(_analyze_in_worker, data, "single")
+
+
 async def a_analyze_image_bytes(data: bytes) -> Dict:
-    import asyncio
-    return await asyncio.to_thread(analyze_image_bytes, data)
+    """Analyze an image in the warm worker pool.
+
+    Results are cached by content hash, and concurrent requests for the same
+    bytes share one analysis. Raises :class:`ImageQueueFull` when
+    ``settings.image_queue_limit`` analyses are already waiting for a worker.
+    """
+    key = _content_key(data)
+    cached = _memory_lookup(key)
+    if cached is not None:
+        return cached
+
+    async def analyze() -> Dict:
+        result = await asyncio.to_thread(_disk_lookup, key)
+        if result is None:
+            result = await _dispatch(data)
+            await asyncio.to_thread(_store, key, result)
+        return result
+
+    return copy.deepcopy(await _FLIGHTS.do(key, analyze))
+
+
+async def a_analyze_image_batch(
+    images: List[Tuple[str, bytes]],
+) -> AsyncIterator[Tuple[str, Optional[Dict], Optional[str]]]:
+    """Analyze many images, yielding ``(name, result, error)`` as they finish.
+
+    Cached images are yielded first. The rest are deduplicated by content and
+    sent to the workers in chunks of ``settings.image_batch_size``, with at
+    most one chunk per worker in flight for this batch.
+    """
+    pending: Dict[str, List[str]] = {}
+    payloads: Dict[str, bytes] = {}
+    for name, data in images:
+        key = _content_key(data)
+        cached = _memory_lookup(key) or await asyncio.to_thread(_disk_lookup, key)
+        if cached is not None:
+            yield name, cached, None
+            continue
+        if key not in payloads:
+            payloads[key] = data
+        pending.setdefault(key, []).append(name)
+
+    keys = list(payloads)
+    size = max(1, settings.image_batch_size)
+    chunks = []
+    for start in range(0, len(keys), size):
+        stop = start + size
+        chunks.append(keys[start:stop])
+    slots = asyncio.Semaphore(max(1, settings.image_workers))
+
+    async def run_chunk(chunk: List[str]) -> List[Tuple[str, Dict]]:
+        async with slots:
+            try:
+                outcomes = await _submit(
+                    _analyze_batch, [payloads[k] for k in chunk], "batch"
+                )
+            except Exception as exc:  # noqa: BLE001
+                outcomes = [{"error": _error_text(exc)}] * len(chunk)
+        for key, outcome in zip(chunk, outcomes):
+            if "result" in outcome:
+                await asyncio.to_thread(_store, key, outcome["result"])
+        return list(zip(chunk, outcomes))
+
+    tasks = [asyncio.ensure_future(run_chunk(chunk)) for chunk in chunks]
+    try:
+        for done in asyncio.as_completed(tasks):
+            for key, outcome in await done:
+                for name in pending[key]:
+                    result = outcome.get("result")
+                    yield name, copy.deepcopy(result), outcome.get("error")
+    finally:
+        for task in tasks:
+            task.cancel()
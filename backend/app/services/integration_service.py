@@ -10,17 +10,18 @@ by dashboard widgets in real time.
 from __future__ import annotations
 
 import asyncio
+import codecs
 import logging
 import re
-from typing import Dict, List, Tuple
+from typing import AsyncIterable, Dict, List, Tuple
 
-import httpx
 from email_validator import EmailNotValidError, validate_email
 
-from .phone_meta_service import parse_phone
+from .phone_meta_service import parse_phones
 from .phone_service import multi_source_lookup
 from .identity_enrichment_service import enrich_identity
-from .image_service import a_analyze_image_bytes
+from .image_service import a_analyze_image_bytes, ImageQueueFull
+from ..core.http import get_http_client
 
 # configure module level logger
 logger = logging.getLogger(__name__)
@@ -29,30 +30,101 @@ logger.setLevel(logging.INFO)
 
 EMAIL_REGEX = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
 PHONE_REGEX = re.compile(r"\+?\d[\d\s().-]{5,}\d")
+# one pass finds both kinds of contact
+CONTACT_REGEX = re.compile(
+    rf"(?P<email>{EMAIL_REGEX.pattern})|(?P<phone>{PHONE_REGEX.pattern})"
+)
+# characters of an email local part, which only matches once its "@" arrives
+_TOKEN_CHAR = re.compile(r"[a-zA-Z0-9_.+-]")
+# tail of each chunk held back because a match there may continue
+_MARGIN = 256
+_MAX_TOKEN = 1024
+
+
+class ContactExtractor:
+    """Extract phone numbers and emails from text fed in chunks.
+
+    Only the tail of each chunk that could still be part of a match is
+    carried over, so arbitrarily large inputs are scanned in bounded memory.
+    Matches are deduplicated as they are found and validated once in
+    :meth:`result`.
+    """
+
+    def __init__(self) -> None:
+        self._carry = ""
+        self._phones: Dict[str, None] = {}
+        self._emails: Dict[str, None] = {}
+
+    def _scan(self, buf: str, limit: int) -> int:
+        """Record matches ending before ``limit``; return where to resume."""
+        cut, last_end = limit, 0
+        for match in CONTACT_REGEX.finditer(buf):
+            if match.end() > limit:
+                cut = min(cut, match.start())
+                break
+            if match.lastgroup == "email":
+                self._emails.setdefault(match.group(), None)
+            else:
+                self._phones.setdefault(match.group(), None)
+            last_end = match.end()
+        start = cut
+        while (
+            start > last_end
+            and cut - start < _MAX_TOKEN
+            and _TOKEN_CHAR.match(buf, start - 1)
+        ):
+            start -= 1
+        return start
+
+    def feed(self, text: str) -> None:
+        buf = self._carry + text
+        limit = len(buf) - _MARGIN
+        if limit <= 0:
+            self._carry = buf
+            return
+        start = self._scan(buf, limit)
+        self._carry = buf[start:]
+
+    def result(self) -> Tuple[List[str], List[str]]:
+        """Flush the carried tail and return valid ``(phones, emails)``."""
+        self._scan(self._carry, len(self._carry))
+        self._carry = ""
+        emails = []
+        for match in self._emails:
+            try:
+                validate_email(match, check_deliverability=False)
+                emails.append(match)
+            except EmailNotValidError:
+                continue
+        matches = list(self._phones)
+        phones = [m for m, data in zip(matches, parse_phones(matches)) if data["valid"]]
+        return phones, emails
 
 
 def extract_contacts(text: str) -> Tuple[List[str], List[str]]:
     """Return lists of valid phone numbers and emails from text."""
-    emails = []
-    for match in EMAIL_REGEX.findall(text):
-        try:
-            validate_email(match, check_deliverability=False)
-            emails.append(match)
-        except EmailNotValidError:
-            continue
-
-    phones = []
-    for match in PHONE_REGEX.findall(text):
-        data = parse_phone(match)
-        if data.get("valid"):
-            phones.append(match)
-    return list(dict.fromkeys(phones)), list(dict.fromkeys(emails))
+    extractor = ContactExtractor()
+    extractor.feed(text)
+    return extractor.result()
+
+
+async def extract_contacts_stream(
+    chunks: AsyncIterable[bytes], encoding: str = "utf-8"
+) -> Tuple[List[str], List[str]]:
+    """Like :func:`extract_contacts` for a byte stream, scanned off the loop."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    extractor = ContactExtractor()
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            await asyncio.to_thread(extractor.feed, text)
+    extractor.feed(decoder.decode(b"", final=True))
+    return await asyncio.to_thread(extractor.result)
 
 
 async def _fetch_image_bytes(url: str) -> bytes | None:
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, timeout=10)
+        resp = await get_http_client().get(url)
         if resp.status_code == 200:
             return resp.content
     except Exception as exc:  # noqa: BLE001
@@ -64,7 +136,11 @@ async def _analyze_profile_image(url: str) -> Dict | None:
     data = await _fetch_image_bytes(url)
     if not data:
         return None
-    return await a_analyze_image_bytes(data)
+    try:
+        return await a_analyze_image_bytes(data)
+    except ImageQueueFull as exc:
+        logger.warning("skipping image analysis for %s: %s", url, exc)
+        return None
 
 
 async def _enrich_phone(number: str) -> Dict:
@@ -77,16 +153,8 @@ async def _enrich_email(email: str) -> Dict:
     return await enrich_identity(email)
 
 
-async def full_osint_scan(text: str) -> Dict:
-    """Run a complete OSINT workflow for the given text.
-
-    Extracts contacts, fetches related social accounts and analyses
-    profile images. The function returns a dictionary suitable for
-    direct consumption by dashboard widgets.
-    """
-
-    phones, emails = extract_contacts(text)
-
+async def scan_contacts(phones: List[str], emails: List[str]) -> Dict:
+    """Enrich extracted contacts and analyse their profile images."""
     phone_tasks = [asyncio.create_task(_enrich_phone(p)) for p in phones]
     email_tasks = [asyncio.create_task(_enrich_email(e)) for e in emails]
 
@@ -95,7 +163,7 @@ async def full_osint_scan(text: str) -> Dict:
 
     image_tasks = []
     for result in phone_results:
-        for prof in result.get("data", {}).get("profiles", []):
+        for prof in (result.get("data") or {}).get("profiles", []):
             if prof.get("profile_picture"):
                 image_tasks.append(
                     asyncio.create_task(_analyze_profile_image(prof["profile_picture"]))
@@ -109,6 +177,17 @@ async def full_osint_scan(text: str) -> Dict:
     }
 
 
+async def full_osint_scan(text: str) -> Dict:
+    """Run a complete OSINT workflow for the given text.
+
+    Extracts contacts, fetches related social accounts and analyses
+    profile images. The function returns a dictionary suitable for
+    direct consumption by dashboard widgets.
+    """
+    phones, emails = extract_contacts(text)
+    return await scan_contacts(phones, emails)
+
+
 # Example usage
 if __name__ == "__main__":
     sample = "Contact me at +12024561111 or user@example.com"
@@ -0,0 +1,296 @@
+"""Background jobs for long-running investigations.
+
+Jobs are persisted in the application SQLite database so that status and
+results survive restarts and can be polled from any worker process. Each
+process runs ``settings.job_workers`` asyncio workers that claim queued jobs
+atomically; a claim is a lease that the running worker keeps renewing, so a
+job whose process died is picked up again once its lease expires.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..core.config import settings
+from ..core.database import get_connection
+from ..core.metrics import JOBS_FINISHED
+from .enrichment_workflow import run_enrichment
+from .integration_service import full_osint_scan
+from .recursive_osint_engine import a_smart_osint_lookup
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, created_at);
+"""
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_schema_lock = threading.Lock()
+_schema_ready: set = set()
+
+_workers: List[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+
+
+def _connect() -> sqlite3.Connection:
+    """Return a connection with the jobs schema in place."""
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    db = settings.database_url
+    if db not in _schema_ready:
+        with _schema_lock:
+            if db not in _schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                columns = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+                if "attempts" not in columns:
+                    conn.execute(
+                        "ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL"
+                        " DEFAULT 0"
+                    )
+                conn.commit()
+                _schema_ready.add(db)
+    return conn
+
+
+async def _write_stages(job_id: str, stages: asyncio.Queue) -> None:
+    """Persist queued stage names in order until ``None`` is received."""
+    while (stage := await stages.get()) is not None:
+        try:
+            await asyncio.to_thread(_set_stage, job_id, stage)
+        except sqlite3.Error as exc:
+            logger.warning("job %s: could not record stage %s: %s", job_id, stage, exc)
+
+
+async def _run_enrichment(job_id: str, params: Dict) -> Any:
+    stages: asyncio.Queue = asyncio.Queue()
+    writer = asyncio.create_task(_write_stages(job_id, stages))
+    try:
+        return await run_enrichment(
+            params["phone_number"], lambda stage, data: stages.put_nowait(stage)
+        )
+    finally:
+        # flush the stages before the job is marked finished
+        stages.put_nowait(None)
+        await writer
+
+
+async def _run_smart_lookup(job_id: str, params: Dict) -> Any:
+    return await a_smart_osint_lookup(params["phone"], params.get("depth", 2))
+
+
+async def _run_integrated_scan(job_id: str, params: Dict) -> Any:
+    return await full_osint_scan(params["text"])
+
+
+JOB_HANDLERS: Dict[str, Callable[[str, Dict], Awaitable[Any]]] = {
+    "enrichment": _run_enrichment,
+    "smart_lookup": _run_smart_lookup,
+    "integrated_scan": _run_integrated_scan,
+}
+
+
+def _job_dict(row: sqlite3.Row, with_result: bool = False) -> Dict:
+    job = {
+        "id": row["id"],
+        "kind": row["kind"],
+        "status": row["status"],
+        "stage": row["stage"],
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+        "attempts": row["attempts"],
+    }
+    if with_result:
+        job["result"] = json.loads(row["result"]) if row["result"] else None
+    return job
+
+
+def submit_job(kind: str, params: Dict) -> Dict:
+    """Queue a job of ``kind`` and return its record."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"unknown job kind {kind!r}")
+    job_id = uuid.uuid4().hex
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "INSERT INTO jobs (id, kind, params, status, created_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(params), QUEUED, time.time()),
+        )
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if _wakeup is not None:
+        _wakeup.set()
+    return _job_dict(row)
+
+
+def get_job(job_id: str, with_result: bool = False) -> Optional[Dict]:
+    """Return the job record, including its result if ``with_result``."""
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _job_dict(row, with_result) if row else None
+
+
+def _claim() -> Optional[sqlite3.Row]:
+    """Atomically take the oldest queued job or one with an expired lease.
+
+    A job that has already been claimed ``settings.job_max_attempts`` times
+    and whose lease ran out again keeps killing its worker, so it is failed
+    instead of being claimed again.
+    """
+    now = time.time()
+    abandoned = []
+    with closing(_connect()) as conn:
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ?"
+                    " OR (status = ? AND lease_expires < ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+                if row is None or row["attempts"] < settings.job_max_attempts:
+                    break
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?,"
+                    " lease_expires = NULL WHERE id = ?",
+                    (
+                        FAILED,
+                        f"abandoned after {row['attempts']} attempts",
+                        now,
+                        row["id"],
+                    ),
+                )
+                abandoned.append(row)
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, lease_expires = ?,"
+                    " attempts = attempts + 1 WHERE id = ?",
+                    (RUNNING, now, now + settings.job_lease, row["id"]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    for job in abandoned:
+        logger.error(
+            "job %s (%s) abandoned after repeated crashes", job["id"], job["kind"]
+        )
+        JOBS_FINISHED.inc(kind=job["kind"], status=FAILED)
+    return row
+
+
+def _renew(job_id: str) -> None:
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = ?",
+            (time.time() + settings.job_lease, job_id, RUNNING),
+        )
+
+
+def _set_stage(job_id: str, stage: str) -> None:
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "UPDATE jobs SET stage = ? WHERE id = ? AND status = ?",
+            (stage, job_id, RUNNING),
+        )
+
+
+def _finish(job_id: str, result: Any = None, error: Optional[str] = None) -> None:
+    status = FAILED if error is not None else SUCCEEDED
+    payload = json.dumps(result, default=str) if error is None else None
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?,"
+            " lease_expires = NULL WHERE id = ?",
+            (status, payload, error, time.time(), job_id),
+        )
+
+
+async def _keep_lease(job_id: str) -> None:
+    while True:
+        await asyncio.sleep(settings.job_lease / 3)
+        await asyncio.to_thread(_renew, job_id)
+
+
+async def run_next_job() -> bool:
+    """Claim and run one job; return ``False`` if none was waiting."""
+    row = await asyncio.to_thread(_claim)
+    if row is None:
+        return False
+    job_id, kind = row["id"], row["kind"]
+    logger.info("running job %s (%s)", job_id, kind)
+    lease = asyncio.create_task(_keep_lease(job_id))
+    try:
+        result = await JOB_HANDLERS[kind](job_id, json.loads(row["params"]))
+    except Exception as exc:  # noqa: BLE001
+        logger.error("job %s (%s) failed: %s", job_id, kind, exc)
+        await asyncio.to_thread(_finish, job_id, error=f"{type(exc).__name__}: {exc}")
+        JOBS_FINISHED.inc(kind=kind, status=FAILED)
+    else:
+        await asyncio.to_thread(_finish, job_id, result)
+        JOBS_FINISHED.inc(kind=kind, status=SUCCEEDED)
+    finally:
+        lease.cancel()
+    return True
+
+
+async def _worker() -> None:
+    while True:
+        try:
+            if await run_next_job():
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            logger.error("job worker error: %s", exc)
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), settings.job_poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_job_workers() -> None:
+    """Start the job workers on the running event loop."""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    for _ in range(settings.job_workers):
+        _workers.append(asyncio.create_task(_worker()))
+
+
+async def stop_job_workers() -> None:
+    """Cancel the job workers; interrupted jobs are retried after their lease."""
+    global _wakeup
+    workers = list(_workers)
+    _workers.clear()
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    _wakeup = None
@@ -1,5 +1,4 @@
 import os
-import json
 from datetime import datetime
 from typing import List, Dict
 
@@ -8,6 +7,7 @@ from .social_service import run_maigret, run_sherlock
 from .email_guess_service import guess_emails
 from .breach_service import scylla_lookup, dehashed_lookup
 from .relationship_service import build_relationship_map
+from .dataset_service import get_dataset
 
 LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../logs"))
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -32,17 +32,10 @@ def _breach_lookup(email: str) -> List[str]:
 def _derive_usernames(number: str) -> List[str]:
     """Attempt to derive usernames from mock dataset or digits."""
     usernames = []
-    dataset_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data/mock_data.json"))
-    try:
-        with open(dataset_path) as f:
-            dataset = json.load(f)
-        for entry in dataset:
-            if entry.get("phone_number") == number:
-                for acct in entry.get("accounts", []):
-                    if ":" in acct:
-                        usernames.append(acct.split(":", 1)[1])
-    except Exception:
-        pass
+    for entry in get_dataset().entries_for_phone(number):
+        for acct in entry.get("accounts", []):
+            if ":" in acct:
+                usernames.append(acct.split(":", 1)[1])
     if not usernames:
         digits = ''.join(filter(str.isdigit, number))
         if len(digits) >= 6:
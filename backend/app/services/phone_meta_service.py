@@ -1,22 +1,69 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
 import phonenumbers
-from phonenumbers import carrier, geocoder, number_type, PhoneNumberType
+from phonenumbers import carrier, geocoder, number_type
 
-def parse_phone(number: str) -> dict:
-    """Return basic metadata about a phone number using phonenumbers."""
-    data = {
-        "phone": number,
-        "valid": False,
-        "country": "Unknown",
-        "carrier": None,
-        "line_type": None,
-    }
+# memoized parses: raw input -> E.164, then E.164 -> metadata, so spellings
+# of the same number share one metadata lookup
+_CACHE_SIZE = 65536
+
+_INVALID = {
+    "valid": False,
+    "country": "Unknown",
+    "carrier": None,
+    "line_type": None,
+}
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _to_e164(number: str, region: Optional[str]) -> Optional[str]:
+    try:
+        parsed = phonenumbers.parse(number, region)
+    except phonenumbers.NumberParseException:
+        return None
+    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _metadata(e164: str) -> Dict:
     try:
-        parsed = phonenumbers.parse(number, None)
-        data["valid"] = phonenumbers.is_valid_number(parsed)
-        data["country"] = geocoder.description_for_number(parsed, "en")
-        data["carrier"] = carrier.name_for_number(parsed, "en") or None
-        type_enum = number_type(parsed)
-        data["line_type"] = str(type_enum).replace("PhoneNumberType.", "")
+        parsed = phonenumbers.parse(e164, None)
     except phonenumbers.NumberParseException:
-        pass
-    return data
+        return _INVALID
+    type_enum = number_type(parsed)
+    return {
+        "valid": phonenumbers.is_valid_number(parsed),
+        "country": geocoder.description_for_number(parsed, "en"),
+        "carrier": carrier.name_for_number(parsed, "en") or None,
+        "line_type": str(type_enum).replace("PhoneNumberType.", ""),
+    }
+
+
+def normalize_phone(number: str, region: Optional[str] = None) -> Optional[str]:
+    """Return ``number`` in E.164 form, or ``None`` if it cannot be parsed.
+
+    ``region`` (e.g. ``"US"``) is used for numbers without a country code.
+    """
+    return _to_e164(number.strip(), region)
+
+
+def parse_phone(number: str) -> dict:
+    """Return basic metadata about a phone number using phonenumbers."""
+    e164 = _to_e164(number, None)
+    meta = _metadata(e164) if e164 is not None else _INVALID
+    return {"phone": number, **meta}
+
+
+def parse_phones(numbers: Iterable[str]) -> List[dict]:
+    """Return :func:`parse_phone` results for ``numbers``, in order.
+
+    Repeated inputs are parsed once and share their metadata lookup.
+    """
+    parsed: Dict[str, dict] = {}
+    results = []
+    for number in numbers:
+        if number not in parsed:
+            parsed[number] = parse_phone(number)
+        results.append(dict(parsed[number]))
+    return results
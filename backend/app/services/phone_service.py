@@ -1,28 +1,52 @@
-import json
 import os
 import subprocess
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 import asyncio
+import weakref
 import time
 import httpx
-from bs4 import BeautifulSoup
 from email_validator import validate_email, EmailNotValidError
-import requests
 
 import logging
 from logging.handlers import RotatingFileHandler
 
-from .phone_meta_service import parse_phone
-from .social_service import run_maigret, run_sherlock
+from .phone_meta_service import parse_phone, normalize_phone
+from .social_service import run_maigret, run_sherlock, a_run_maigret, a_run_sherlock
 from .email_guess_service import guess_emails
-from .breach_service import scylla_lookup, dehashed_lookup
+from .breach_service import (
+    scylla_lookup,
+    dehashed_lookup,
+    scylla_rows,
+    a_scylla_lookup,
+    a_dehashed_lookup,
+    a_scylla_rows,
+    _project,
+)
 from .osint_service import _breach_lookup
 from .relationship_service import build_relationship_map
+from .dataset_service import get_dataset
+from .html_service import fetch_page_images
+from ..core.cache import ResultCache
+from ..core.circuit_breaker import CircuitOpenError, a_guarded_get, guarded_get
+from ..core.config import settings
+from ..core.metrics import SOURCE_ERRORS, SOURCE_LATENCY
+from ..core.http import get_http_client, run_with_http_client
+from ..core.singleflight import single_flight
+
+
+# persistent result caches {phone_number: response_dict}, shared by workers
+ANALYZE_CACHE = ResultCache("analyze_phone")
+LOOKUP_CACHE = ResultCache("multi_source_lookup")
+ENRICH_CACHE = ResultCache("enrich_phone_data")
 
+# error reported for a source that missed its deadline
+TIMEOUT = "timeout"
+# late sources left running to warm the caches
+_BACKGROUND: set = set()
 
-# simple in-memory cache {phone_number: response_dict}
-CACHE: Dict[str, dict] = {}
+# bulk lookup limit shared by all requests, one semaphore per event loop
+_BULK_LIMITS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
 # ensure logs directory exists
 LOG_DIR = os.getenv(
@@ -65,78 +89,108 @@ def _query_hibp(number: str) -> List[str]:
 
 
 async def _a_query_maigret(number: str) -> List[str]:
-    return await asyncio.to_thread(_query_maigret, number)
+    return [a["profile"] for a in await a_run_maigret(number)]
 
 
 async def _a_query_hibp(number: str) -> List[str]:
-    return await asyncio.to_thread(_query_hibp, number)
+    try:
+        breaches = await a_scylla_lookup(number, "phone")
+    except CircuitOpenError:
+        # fall back to dehashed; if it is down too its error is reported
+        breaches = []
+    if not breaches:
+        breaches = await a_dehashed_lookup(number)
+    return breaches
 
 
 async def _a_query_sherlock(number: str) -> List[str]:
-    return await asyncio.to_thread(_query_sherlock, number)
+    return [a["profile"] for a in await a_run_sherlock(number)]
 
 
-def _query_truecaller(number: str) -> Optional[str]:
-    """Return the subscriber name from the Truecaller API if available."""
+def _truecaller_url(number: str) -> Optional[str]:
     api_key = os.getenv("TRUECALLER_API_KEY")
     if not api_key:
         return None
-    url = f"https://api.truecaller.com/v1/search?q={number}&type=phone&token={api_key}"
+    return f"https://api.truecaller.com/v1/search?q={number}&type=phone&token={api_key}"
+
+
+def _numlookup_url(number: str) -> Optional[str]:
+    api_key = os.getenv("NUMLOOKUP_API_KEY")
+    if not api_key:
+        return None
+    return f"https://api.numlookupapi.com/v1/validate/{number}?apikey={api_key}"
+
+
+def _parse_numlookup(data: Dict) -> Dict[str, Optional[str]]:
+    return {
+        "name": data.get("carrier_name"),
+        "carrier": data.get("carrier"),
+    }
+
+
+def _query_truecaller(number: str) -> Optional[str]:
+    """Return the subscriber name from the Truecaller API if available."""
+    url = _truecaller_url(number)
+    if not url:
+        return None
     try:
-        r = requests.get(url, timeout=10)
+        r = guarded_get("truecaller", url)
         if r.status_code == 200:
-            data = r.json()
-            return data.get("name")
-    except Exception:
-        pass
+            return r.json().get("name")
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("truecaller lookup failed: %s", exc)
     return None
 
 
 def _query_numlookup(number: str) -> Dict[str, Optional[str]]:
     """Return name and carrier info from NumLookup API if configured."""
-    api_key = os.getenv("NUMLOOKUP_API_KEY")
-    if not api_key:
+    url = _numlookup_url(number)
+    if not url:
         return {}
-    url = f"https://api.numlookupapi.com/v1/validate/{number}?apikey={api_key}"
     try:
-        r = requests.get(url, timeout=10)
+        r = guarded_get("numlookup", url)
         if r.status_code == 200:
-            data = r.json()
-            return {
-                "name": data.get("carrier_name"),
-                "carrier": data.get("carrier"),
-            }
-    except Exception:
-        pass
+            return _parse_numlookup(r.json())
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("numlookup lookup failed: %s", exc)
     return {}
 
 
 async def _a_query_truecaller(number: str) -> Optional[str]:
-    return await asyncio.to_thread(_query_truecaller, number)
+    """Async variant of :func:`_query_truecaller`.
+
+    Errors, including an open circuit breaker, are raised to the caller.
+    """
+    url = _truecaller_url(number)
+    if not url:
+        return None
+    r = await a_guarded_get("truecaller", url)
+    return r.json().get("name") if r.status_code == 200 else None
 
 
 async def _a_query_numlookup(number: str) -> Dict[str, Optional[str]]:
-    return await asyncio.to_thread(_query_numlookup, number)
+    """Async variant of :func:`_query_numlookup`.
+
+    Errors, including an open circuit breaker, are raised to the caller.
+    """
+    url = _numlookup_url(number)
+    if not url:
+        return {}
+    r = await a_guarded_get("numlookup", url)
+    return _parse_numlookup(r.json()) if r.status_code == 200 else {}
 
 
 def _scylla_email_lookup(number: str) -> List[str]:
     """Return emails from scylla.sh related to the phone number."""
-    url = f"https://scylla.sh/search?q={number}&type=phone"
-    try:
-        r = requests.get(url, timeout=10)
-        if r.status_code == 200:
-            data = r.json()
-            emails = [
-                row.get("email") for row in data.get("data", []) if row.get("email")
-            ]
-            return list(dict.fromkeys(emails))
-    except Exception:
-        pass
-    return []
+    return _project(scylla_rows(number, "phone"), "email")
 
 
 async def _a_scylla_email_lookup(number: str) -> List[str]:
-    return await asyncio.to_thread(_scylla_email_lookup, number)
+    try:
+        return _project(await a_scylla_rows(number, "phone"), "email")
+    except CircuitOpenError as exc:
+        logger.info("scylla email lookup skipped for %s: %s", number, exc)
+        return []
 
 
 def _verify_email(email: str) -> bool:
@@ -164,28 +218,15 @@ def _detect_platform(url: str) -> str:
 
 
 async def _fetch_avatar(client: httpx.AsyncClient, url: str) -> Optional[str]:
-    try:
-        resp = await client.get(url, timeout=10)
-        if resp.status_code == 200:
-            soup = BeautifulSoup(resp.text, "html.parser")
-            meta = soup.find("meta", property="og:image") or soup.find(
-                "meta", attrs={"name": "twitter:image"}
-            )
-            if meta and meta.get("content"):
-                return meta["content"]
-            img = soup.find("img")
-            if img and img.get("src"):
-                return img["src"]
-    except Exception:
-        pass
-    return None
+    page = await fetch_page_images(client, url)
+    return page["image"] if page else None
 
 
 async def _gather_profile_data(urls: List[str]) -> List[Dict]:
     results: List[Dict] = []
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        tasks = [asyncio.create_task(_fetch_avatar(client, u)) for u in urls]
-        avatars = await asyncio.gather(*tasks)
+    client = get_http_client()
+    tasks = [asyncio.create_task(_fetch_avatar(client, u)) for u in urls]
+    avatars = await asyncio.gather(*tasks)
     for url, avatar in zip(urls, avatars):
         results.append(
             {
@@ -197,12 +238,27 @@ async def _gather_profile_data(urls: List[str]) -> List[Dict]:
     return results
 
 
-async def _collect_social_profiles(number: str) -> List[Dict]:
-    maigret_accounts = await asyncio.to_thread(run_maigret, number)
-    sherlock_accounts = await asyncio.to_thread(run_sherlock, number)
+async def _collect_social_profiles(
+    number: str, sink: Optional[Dict] = None
+) -> List[Dict]:
+    maigret_accounts, sherlock_accounts = await asyncio.gather(
+        a_run_maigret(number), a_run_sherlock(number)
+    )
     accounts = maigret_accounts + [
         a for a in sherlock_accounts if a not in maigret_accounts
     ]
+    if sink is not None:
+        # profiles without avatars, in case scraping misses the deadline
+        sink["social"] = [
+            {
+                "platform": _detect_platform(a["profile"]),
+                "profile_url": a["profile"],
+                "profile_picture": None,
+                "username": a.get("username"),
+            }
+            for a in accounts
+            if a.get("profile")
+        ]
     urls = [a.get("profile") for a in accounts if a.get("profile")]
     details = await _gather_profile_data(urls)
     for detail in details:
@@ -213,7 +269,9 @@ async def _collect_social_profiles(number: str) -> List[Dict]:
     return details
 
 
-async def _collect_emails(number: str) -> Tuple[List[str], List[str]]:
+async def _collect_emails(
+    number: str, sink: Optional[Dict] = None
+) -> Tuple[List[str], List[str]]:
     dataset_emails = await _a_lookup_emails(number)
     scylla_emails = await _a_scylla_email_lookup(number)
     emails = list(dict.fromkeys(dataset_emails + scylla_emails))
@@ -222,6 +280,8 @@ async def _collect_emails(number: str) -> Tuple[List[str], List[str]]:
     verif_tasks = [asyncio.create_task(_a_verify_email(e)) for e in emails]
     verifs = await asyncio.gather(*verif_tasks)
     valid_emails = [e for e, ok in zip(emails, verifs) if ok]
+    if sink is not None:
+        sink["emails"] = (valid_emails, [])
     breach_tasks = [asyncio.create_task(_a_query_email_hibp(e)) for e in valid_emails]
     breach_results = await asyncio.gather(*breach_tasks)
     email_breaches: List[str] = []
@@ -233,18 +293,7 @@ async def _collect_emails(number: str) -> Tuple[List[str], List[str]]:
 
 def _lookup_emails(number: str) -> List[str]:
     """Return known emails for a phone number from the mock dataset."""
-    data_path = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "../data/mock_data.json")
-    )
-    try:
-        with open(data_path) as f:
-            dataset = json.load(f)
-        for entry in dataset:
-            if entry.get("phone_number") == number and entry.get("email"):
-                return [entry["email"]]
-    except Exception:
-        pass
-    return []
+    return get_dataset().emails_for_phone(number)[:1]
 
 
 async def _a_lookup_emails(number: str) -> List[str]:
@@ -256,7 +305,16 @@ def _query_email_hibp(email: str) -> List[str]:
 
 
 async def _a_query_email_hibp(email: str) -> List[str]:
-    return await asyncio.to_thread(_query_email_hibp, email)
+    try:
+        breaches = await a_scylla_lookup(email, "email")
+    except CircuitOpenError:
+        breaches = []
+    if breaches:
+        return breaches
+    try:
+        return await a_dehashed_lookup(email)
+    except CircuitOpenError:
+        return []
 
 
 def _log_query(phone: str, status: str, error: Optional[str] = None) -> None:
@@ -284,8 +342,9 @@ async def _a_build_relationship_map(
 
 def analyze_phone(phone_number: str) -> dict:
     """Return OSINT intelligence for the given phone number."""
-    if phone_number in CACHE:
-        return CACHE[phone_number]
+    cached = ANALYZE_CACHE.get(phone_number)
+    if cached is not None:
+        return cached
 
     result: Dict = {
         "phone_number": phone_number,
@@ -348,15 +407,60 @@ def analyze_phone(phone_number: str) -> dict:
         "timestamp": datetime.utcnow().isoformat() + "Z",
     }
 
-    CACHE[phone_number] = resp
+    ANALYZE_CACHE.set(phone_number, resp)
     _log_query(phone_number, resp["status"])
     return resp
 
 
-async def multi_source_lookup(phone_number: str) -> dict:
-    """Run multiple OSINT lookups concurrently for a phone number."""
-    if phone_number in CACHE:
-        return CACHE[phone_number]
+def _is_partial(resp: Dict) -> bool:
+    """Return True if a source of ``resp`` missed its deadline."""
+    return TIMEOUT in (resp.get("errors") or {}).values()
+
+
+def _source_deadline(
+    name: str, budget: float, source_timeouts: Optional[Dict[str, float]]
+) -> float:
+    timeouts = {**settings.lookup_source_timeouts, **(source_timeouts or {})}
+    return min(budget, timeouts.get(name, settings.lookup_source_timeout))
+
+
+def _keep_in_background(task: asyncio.Task) -> None:
+    _BACKGROUND.add(task)
+    task.add_done_callback(_BACKGROUND.discard)
+    # retrieve the outcome so a late failure is not reported as unhandled
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+def _final_event(resp: Dict) -> Dict:
+    return {
+        "event": "result",
+        "response": resp,
+        "confidence": _calculate_confidence(resp.get("data") or {}),
+    }
+
+
+async def a_stream_lookup(
+    phone_number: str,
+    budget: Optional[float] = None,
+    source_timeouts: Optional[Dict[str, float]] = None,
+    finish_in_background: Optional[bool] = None,
+) -> AsyncIterator[Dict]:
+    """Run the lookup sources for a phone number, yielding as each finishes.
+
+    Every source yields ``{"event": "source", "source", "data", "error",
+    "duration"}`` as soon as it completes or misses its deadline. The last
+    event is ``{"event": "result", "response", "confidence"}`` carrying the
+    merged response of :func:`multi_source_lookup`; a cached or invalid
+    number yields only that event. Budgets, deadlines and caching behave as
+    described there.
+    """
+    budget = settings.lookup_budget if budget is None else budget
+    if finish_in_background is None:
+        finish_in_background = settings.lookup_finish_in_background
+    cached = await asyncio.to_thread(LOOKUP_CACHE.get, phone_number)
+    if cached is not None:
+        yield _final_event(cached)
+        return
 
     result: Dict = {
         "phone_number": phone_number,
@@ -391,40 +495,75 @@ async def multi_source_lookup(phone_number: str) -> dict:
             "timestamp": datetime.utcnow().isoformat() + "Z",
         }
         _log_query(phone_number, resp["status"], "Invalid phone number")
-        return resp
+        yield _final_event(resp)
+        return
+
+    # partial results written by sources as they progress
+    sink: Dict[str, object] = {}
 
     async def run_source(name: str, coro):
         start = time.perf_counter()
+        task = asyncio.ensure_future(coro)
         try:
-            res = await coro
-            timings[name] = time.perf_counter() - start
-            _log_source_time(phone_number, name, timings[name])
-            return res
+            done, _ = await asyncio.wait(
+                {task}, timeout=_source_deadline(name, budget, source_timeouts)
+            )
+            if not done:
+                errors[name] = TIMEOUT
+                SOURCE_ERRORS.inc(source=name)
+                if finish_in_background:
+                    _keep_in_background(task)
+                else:
+                    task.cancel()
+                return sink.get(name)
+            return task.result()
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
         except Exception as exc:
-            timings[name] = time.perf_counter() - start
-            _log_source_time(phone_number, name, timings[name])
             errors[name] = str(exc)
+            SOURCE_ERRORS.inc(source=name)
             return None
+        finally:
+            timings[name] = time.perf_counter() - start
+            _log_source_time(phone_number, name, timings[name])
+            SOURCE_LATENCY.observe(timings[name], source=name)
 
-    tasks = {
-        "social": asyncio.create_task(
-            run_source("social", _collect_social_profiles(phone_number))
-        ),
-        "hibp": asyncio.create_task(run_source("hibp", _a_query_hibp(phone_number))),
-        "emails": asyncio.create_task(
-            run_source("emails", _collect_emails(phone_number))
-        ),
-        "truecaller": asyncio.create_task(
-            run_source("truecaller", _a_query_truecaller(phone_number))
-        ),
-        "numlookup": asyncio.create_task(
-            run_source("numlookup", _a_query_numlookup(phone_number))
-        ),
+    async def named(name: str, coro) -> Tuple[str, object]:
+        return name, await run_source(name, coro)
+
+    sources = {
+        "social": _collect_social_profiles(phone_number, sink),
+        "hibp": _a_query_hibp(phone_number),
+        "emails": _collect_emails(phone_number, sink),
+        "truecaller": _a_query_truecaller(phone_number),
+        "numlookup": _a_query_numlookup(phone_number),
     }
+    tasks = [asyncio.create_task(named(n, c)) for n, c in sources.items()]
+    results: Dict[str, object] = {}
+    try:
+        for done in asyncio.as_completed(tasks):
+            name, value = await done
+            results[name] = value
+            if name == "emails" and value is not None:
+                value = {"emails": value[0], "email_breaches": value[1]}
+            yield {
+                "event": "source",
+                "source": name,
+                "data": value,
+                "error": errors.get(name),
+                "duration": round(timings[name], 3),
+            }
+    finally:
+        # the consumer went away: stop the remaining sources
+        for task in tasks:
+            task.cancel()
 
-    results = await asyncio.gather(*tasks.values())
-    profiles, breaches, email_data, tc_name, num_data = results
-    valid_emails, email_breaches = email_data or ([], [])
+    profiles = results["social"]
+    breaches = results["hibp"]
+    tc_name = results["truecaller"]
+    num_data = results["numlookup"]
+    valid_emails, email_breaches = results["emails"] or ([], [])
 
     if profiles is not None:
         result["profiles"] = profiles
@@ -472,9 +611,33 @@ async def multi_source_lookup(phone_number: str) -> dict:
         "timestamp": datetime.utcnow().isoformat() + "Z",
     }
 
-    CACHE[phone_number] = resp
+    if not _is_partial(resp):
+        await asyncio.to_thread(LOOKUP_CACHE.set, phone_number, resp)
     _log_query(phone_number, resp["status"])
-    return resp
+    yield _final_event(resp)
+
+
+@single_flight
+async def multi_source_lookup(
+    phone_number: str,
+    budget: Optional[float] = None,
+    source_timeouts: Optional[Dict[str, float]] = None,
+    finish_in_background: Optional[bool] = None,
+) -> dict:
+    """Run multiple OSINT lookups concurrently for a phone number.
+
+    The lookup returns within ``budget`` seconds (``settings.lookup_budget``).
+    Each source also has its own deadline, ``source_timeouts[name]`` or
+    ``settings.lookup_source_timeout``. A late source is reported as
+    ``"timeout"`` in ``errors`` with whatever partial data it produced, and
+    either keeps running in the background to warm the caches or is
+    cancelled. Partial responses are not cached.
+    """
+    async for event in a_stream_lookup(
+        phone_number, budget, source_timeouts, finish_in_background
+    ):
+        pass
+    return event["response"]
 
 
 def _calculate_confidence(data: Dict) -> float:
@@ -495,7 +658,11 @@ def _calculate_confidence(data: Dict) -> float:
 
 def enrich_phone_data(phone_number: str) -> dict:
     """Run lookups and return a unified enrichment structure."""
-    result = asyncio.run(multi_source_lookup(phone_number))
+    cached = ENRICH_CACHE.get(phone_number)
+    if cached is not None:
+        return cached
+
+    result = run_with_http_client(multi_source_lookup(phone_number))
     if result.get("status") != "success" or not result.get("data"):
         return result
 
@@ -517,16 +684,23 @@ def enrich_phone_data(phone_number: str) -> dict:
         "sources": data.get("sources_used", []),
     }
 
-    return {
+    resp = {
         "status": result["status"],
         "data": unified,
         "errors": result.get("errors"),
         "timestamp": result.get("timestamp"),
     }
+    if not _is_partial(resp):
+        ENRICH_CACHE.set(phone_number, resp)
+    return resp
 
 
 async def a_enrich_phone_data(phone_number: str) -> dict:
     """Async wrapper around :func:`enrich_phone_data`."""
+    cached = await asyncio.to_thread(ENRICH_CACHE.get, phone_number)
+    if cached is not None:
+        return cached
+
     result = await multi_source_lookup(phone_number)
     if result.get("status") != "success" or not result.get("data"):
         return result
@@ -549,9 +723,83 @@ async def a_enrich_phone_data(phone_number: str) -> dict:
         "sources": data.get("sources_used", []),
     }
 
-    return {
+    resp = {
         "status": result["status"],
         "data": unified,
         "errors": result.get("errors"),
         "timestamp": result.get("timestamp"),
     }
+    if not _is_partial(resp):
+        await asyncio.to_thread(ENRICH_CACHE.set, phone_number, resp)
+    return resp
+
+
+def _bulk_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _BULK_LIMITS.get(loop)
+    if sem is None:
+        sem = _BULK_LIMITS[loop] = asyncio.Semaphore(settings.bulk_concurrency)
+    return sem
+
+
+async def a_bulk_lookup(
+    numbers: List[str], region: Optional[str] = None
+) -> AsyncIterator[Dict]:
+    """Run :func:`multi_source_lookup` over many numbers, yielding as they finish.
+
+    Numbers are normalized to E.164 and deduplicated first; every input is
+    reported under ``inputs`` of its number's result. A fixed pool of
+    ``settings.bulk_concurrency`` workers pulls numbers from a queue, so at
+    most that many lookups and unread results exist per request; lookups
+    across all bulk requests share the same bound. A failing number is
+    reported as an error item instead of aborting the batch.
+    """
+    inputs: Dict[str, List[str]] = {}
+    for raw in numbers:
+        e164 = normalize_phone(raw, region)
+        if e164 is None:
+            yield {
+                "inputs": [raw],
+                "phone_number": None,
+                "status": "error",
+                "data": None,
+                "errors": {"phonenumbers": "unparseable"},
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+            }
+            continue
+        inputs.setdefault(e164, []).append(raw)
+
+    limit = _bulk_semaphore()
+
+    async def lookup(number: str) -> Dict:
+        try:
+            async with limit:
+                resp = await multi_source_lookup(number)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("bulk lookup failed for %s: %s", number, exc)
+            resp = {
+                "status": "error",
+                "data": None,
+                "errors": {"lookup": str(exc)},
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+            }
+        return {"inputs": inputs[number], "phone_number": number, **resp}
+
+    size = max(1, min(settings.bulk_concurrency, len(inputs)))
+    todo: asyncio.Queue = asyncio.Queue()
+    for number in inputs:
+        todo.put_nowait(number)
+    results: asyncio.Queue = asyncio.Queue(maxsize=size)
+
+    async def worker() -> None:
+        while not todo.empty():
+            number = todo.get_nowait()
+            await results.put(await lookup(number))
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(size)]
+    try:
+        for _ in range(len(inputs)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
@@ -5,12 +5,12 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-import subprocess
 from typing import Dict, List, Optional
 
-import httpx
-
-from .social_service import run_maigret, run_sherlock
+from .breach_service import a_scylla_rows
+from ..core.circuit_breaker import CircuitOpenError
+from ..core.subprocess_pool import run_tool
+from .social_service import a_run_maigret, a_run_sherlock
 
 logger = logging.getLogger(__name__)
 
@@ -27,16 +27,18 @@ async def _run_with_backoff(coro, retries: int = 3, delay: float = 1.0):
             await asyncio.sleep(delay * attempt)
 
 
-def _run_cli(cmd: List[str]) -> str:
+async def _run_cli(tool: str, cmd: List[str]) -> str:
     """Return stdout from running a CLI command."""
-    return subprocess.check_output(cmd, text=True)
+    proc = await run_tool(tool, cmd)
+    proc.check_returncode()
+    return proc.stdout
 
 
 async def detectdee_usernames(number: str) -> List[str]:
     """Extract usernames from DetectDee CLI output."""
     cmd = ["detectdee", "--phone", number, "--json"]
     try:
-        output = await _run_with_backoff(lambda: asyncio.to_thread(_run_cli, cmd))
+        output = await _run_with_backoff(lambda: _run_cli("detectdee", cmd))
         data = json.loads(output)
         return [r.get("username") for r in data.get("results", []) if r.get("username")]
     except Exception as exc:  # noqa: BLE001
@@ -48,7 +50,7 @@ async def ignorant_usernames(number: str) -> List[str]:
     """Extract usernames from Ignorant CLI output."""
     cmd = ["ignorant", "--phone", number, "--json"]
     try:
-        output = await _run_with_backoff(lambda: asyncio.to_thread(_run_cli, cmd))
+        output = await _run_with_backoff(lambda: _run_cli("ignorant", cmd))
         data = json.loads(output)
         return [r.get("username") for r in data.get("results", []) if r.get("username")]
     except Exception as exc:  # noqa: BLE001
@@ -58,16 +60,13 @@ async def ignorant_usernames(number: str) -> List[str]:
 
 async def _fetch_scylla_usernames(number: str) -> List[str]:
     """Query scylla.sh for leaked usernames associated with the number."""
-    url = f"https://scylla.sh/search?q={number}&type=phone"
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await _run_with_backoff(lambda: client.get(url, timeout=10))
-            if resp.status_code == 200:
-                data = resp.json()
-                return [row.get("username") for row in data.get("data", []) if row.get("username")]
-    except Exception as exc:  # noqa: BLE001
-        logger.debug("scylla lookup failed: %s", exc)
-    return []
+        # retried like the CLI sources, since one error would lose the source
+        rows = await a_scylla_rows(number, "phone", attempts=3)
+    except CircuitOpenError as exc:
+        logger.debug("scylla usernames skipped: %s", exc)
+        return []
+    return [row.get("username") for row in rows if row.get("username")]
 
 
 async def _collect_usernames(number: str) -> List[str]:
@@ -88,9 +87,7 @@ async def _collect_usernames(number: str) -> List[str]:
 
 async def _run_profile_queries(username: str) -> List[Dict[str, str]]:
     """Run Maigret and Sherlock for a single username."""
-    maigret_future = asyncio.to_thread(run_maigret, username)
-    sherlock_future = asyncio.to_thread(run_sherlock, username)
-    results = await asyncio.gather(maigret_future, sherlock_future)
+    results = await asyncio.gather(a_run_maigret(username), a_run_sherlock(username))
     accounts: List[Dict[str, str]] = []
     for arr in results:
         accounts.extend(arr or [])
@@ -1,39 +1,44 @@
-import json
-import os
-from typing import Dict, List, Set
+import asyncio
+from typing import Awaitable, Dict, List, Optional, Set, Tuple, TypeVar
 
+from ..core.circuit_breaker import CircuitOpenError
+from ..core.config import settings
+from ..core.http import run_with_http_client
 from .phone_meta_service import parse_phone
-from .social_service import run_maigret, run_sherlock
+from .social_service import a_run_maigret, a_run_sherlock
 from .email_guess_service import guess_emails
-from .breach_service import scylla_lookup
+from .breach_service import a_scylla_lookup
+from .dataset_service import get_dataset
 
-DATA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data/mock_data.json"))
-try:
-    with open(DATA_PATH) as f:
-        DATASET = json.load(f)
-except Exception:
-    DATASET = []
+T = TypeVar("T")
+
+
+async def _email_exposures(email: str) -> List[str]:
+    try:
+        return await a_scylla_lookup(email, "email")
+    except CircuitOpenError:
+        return []
 
 
 def _phones_for_email(email: str) -> List[str]:
-    phones = []
-    for entry in DATASET:
-        if entry.get("email") == email:
-            phones.append(entry.get("phone_number"))
-    return phones
+    return get_dataset().phones_for_email(email)
 
 
 def _phones_for_username(username: str) -> List[str]:
-    phones = []
-    for entry in DATASET:
-        for acct in entry.get("accounts", []):
-            if ":" in acct and acct.split(":", 1)[1] == username:
-                phones.append(entry.get("phone_number"))
-    return phones
+    return get_dataset().phones_for_username(username)
 
 
-def smart_osint_lookup(phone_number: str, depth: int = 2) -> dict:
-    """Recursively gather OSINT intelligence about a phone number."""
+async def a_smart_osint_lookup(
+    phone_number: str, depth: int = 2, concurrency: Optional[int] = None
+) -> dict:
+    """Breadth-first OSINT expansion around a phone number.
+
+    Every phone of a depth level is expanded concurrently; external scans are
+    bounded by ``concurrency`` (default ``settings.osint_concurrency``). Each
+    username and email is only scanned once, when first discovered.
+    """
+    limit = asyncio.Semaphore(concurrency or settings.osint_concurrency)
+
     visited_phones: Set[str] = set()
     visited_emails: Set[str] = set()
     visited_usernames: Set[str] = set()
@@ -42,82 +47,116 @@ def smart_osint_lookup(phone_number: str, depth: int = 2) -> dict:
     relationships: List[Dict] = []
     sources: Set[str] = set()
 
-    graph = {"nodes": [], "edges": []}
+    nodes: Dict[str, Dict] = {}
+    edges: List[Dict] = []
+    edge_keys: Set[Tuple[str, str, str]] = set()
 
     def add_node(node_id: str, label: str, ntype: str):
-        if not any(n.get("id") == node_id for n in graph["nodes"]):
-            graph["nodes"].append({"id": node_id, "label": label, "type": ntype})
+        if node_id not in nodes:
+            nodes[node_id] = {"id": node_id, "label": label, "type": ntype}
 
     def add_edge(frm: str, to: str, rel: str):
-        graph["edges"].append({"from": frm, "to": to, "type": rel})
+        key = (frm, to, rel)
+        if key not in edge_keys:
+            edge_keys.add(key)
+            edges.append({"from": frm, "to": to, "type": rel})
 
-    def process_phone(pn: str, level: int):
-        if pn in visited_phones or level > depth:
-            return
-        visited_phones.add(pn)
-        entities["phones"].append(pn)
-        add_node(pn, pn, "phone")
+    async def bounded(coro: Awaitable[T]) -> T:
+        async with limit:
+            return await coro
 
+    async def expand_phone(pn: str) -> List[str]:
+        """Scan one phone and return the phones it links to."""
         meta = parse_phone(pn)
         sources.add("phonenumbers")
         if meta.get("carrier"):
-            relationships.append({"from": pn, "to": meta.get("carrier"), "type": "carrier"})
+            relationships.append(
+                {"from": pn, "to": meta.get("carrier"), "type": "carrier"}
+            )
 
-        accounts = run_maigret(pn)
+        accounts = await bounded(a_run_maigret(pn))
         if accounts:
             sources.add("maigret")
+        new_usernames: List[str] = []
         for acct in accounts:
             entities["accounts"].append(acct)
             uname = acct.get("username")
             if uname and uname not in visited_usernames:
                 visited_usernames.add(uname)
+                new_usernames.append(uname)
                 entities["usernames"].append(uname)
                 add_node(uname, uname, "username")
                 add_edge(pn, uname, "possible_owner")
 
-        for uname in list(visited_usernames):
-            sherlock_accounts = run_sherlock(uname)
+        sherlock_results = await asyncio.gather(
+            *(bounded(a_run_sherlock(u)) for u in new_usernames)
+        )
+        for uname, sherlock_accounts in zip(new_usernames, sherlock_results):
             if sherlock_accounts:
                 sources.add("sherlock")
             for acct in sherlock_accounts:
                 entities["accounts"].append(acct)
                 add_edge(uname, acct.get("profile"), "social_presence")
 
-        emails = guess_emails(list(visited_usernames))
+        emails = guess_emails(new_usernames)
         if emails:
             sources.add("inference")
+        new_emails: List[str] = []
         for e in emails:
             email = e.get("email")
             if email in visited_emails:
                 continue
             visited_emails.add(email)
+            new_emails.append(email)
             entities["emails"].append(email)
             add_node(email, email, "email")
             add_edge(pn, email, "related_email")
 
-            exposures = scylla_lookup(email, "email")
+        exposure_results = await asyncio.gather(
+            *(bounded(_email_exposures(email)) for email in new_emails)
+        )
+        linked: List[str] = []
+        for email, exposures in zip(new_emails, exposure_results):
             if exposures:
                 sources.add("scylla")
                 for src in exposures:
                     relationships.append({"from": email, "to": src, "type": "breach"})
-
             for new_phone in _phones_for_email(email):
                 add_edge(email, new_phone, "co-breached")
-                process_phone(new_phone, level + 1)
+                linked.append(new_phone)
 
-        for uname in list(visited_usernames):
+        for uname in new_usernames:
             for new_phone in _phones_for_username(uname):
                 add_edge(uname, new_phone, "same_username")
-                process_phone(new_phone, level + 1)
-
-    process_phone(phone_number, 0)
+                linked.append(new_phone)
+        return linked
+
+    frontier = [phone_number]
+    level = 0
+    while frontier and level <= depth:
+        current: List[str] = []
+        for pn in frontier:
+            if pn in visited_phones:
+                continue
+            visited_phones.add(pn)
+            entities["phones"].append(pn)
+            add_node(pn, pn, "phone")
+            current.append(pn)
+        linked_lists = await asyncio.gather(*(expand_phone(pn) for pn in current))
+        frontier = [pn for linked in linked_lists for pn in linked]
+        level += 1
 
     confidence = min(1.0, 0.25 * sum(bool(entities[key]) for key in entities))
 
     return {
         "entities": entities,
         "relationships": relationships,
-        "graph": graph,
+        "graph": {"nodes": list(nodes.values()), "edges": edges},
         "sources": list(sources),
         "confidence_scores": {"overall": round(confidence, 2)},
     }
+
+
+def smart_osint_lookup(phone_number: str, depth: int = 2) -> dict:
+    """Synchronous wrapper around :func:`a_smart_osint_lookup`."""
+    return run_with_http_client(a_smart_osint_lookup(phone_number, depth))
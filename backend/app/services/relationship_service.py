@@ -1,8 +1,9 @@
-import json
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
 import logging
 
+from .dataset_service import get_dataset
+
 LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../logs"))
 os.makedirs(LOG_DIR, exist_ok=True)
 REL_LOG_PATH = os.path.join(LOG_DIR, "relationships.log")
@@ -18,42 +19,53 @@ def build_relationship_map(
     breaches: List[str],
     emails: Optional[List[str]] = None,
 ) -> (List[Dict], Dict):
-    """Create relationship mapping for a phone number based on mock data."""
+    """Create relationship mapping for a phone number based on mock data.
+
+    All lookups go through the dataset's reverse indexes, so the cost grows
+    with the number of related entries found rather than the dataset size.
+    A phone listed more than once is described by its last entry.
+    """
+    dataset = get_dataset()
     relationships: List[Dict] = []
     nodes: List[Dict] = [{"id": number, "label": number}]
+    node_ids: Set[str] = {number}
     edges: List[Dict] = []
+    seen: Set[Tuple[str, Optional[str], str, str]] = set()
+
+    def entry_of(phone: str) -> Dict:
+        entries = dataset.entries_for_phone(phone)
+        return entries[-1] if entries else {}
 
-    data_path = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "../data/mock_data.json")
-    )
-    try:
-        with open(data_path) as f:
-            dataset = json.load(f)
-    except Exception:
-        dataset = []
+    def name_of(phone: str) -> Optional[str]:
+        return entry_of(phone).get("name")
 
-    entry_map = {e.get("phone_number"): e for e in dataset}
-    email_map = {e.get("phone_number"): e.get("email") for e in dataset if e.get("email")}
+    def add_node(node_id: str, label: str) -> None:
+        if node_id not in node_ids:
+            node_ids.add(node_id)
+            nodes.append({"id": node_id, "label": label})
 
     def add_relation(target: str, name: Optional[str], rel: str, source: str) -> None:
-        data = {
-            "phone_number": target,
-            "name": name,
-            "relationship": rel,
-            "source": source,
-        }
-        if data not in relationships:
-            relationships.append(data)
-            nodes.append({"id": target, "label": name or target})
-            edges.append({"from": number, "to": target, "label": rel})
-            rel_logger.info("%s\t%s\t%s\t%s", number, target, rel, source)
+        key = (target, name, rel, source)
+        if key in seen:
+            return
+        seen.add(key)
+        relationships.append(
+            {
+                "phone_number": target,
+                "name": name,
+                "relationship": rel,
+                "source": source,
+            }
+        )
+        add_node(target, name or target)
+        edges.append({"from": number, "to": target, "label": rel})
+        rel_logger.info("%s\t%s\t%s\t%s", number, target, rel, source)
 
-    if number in entry_map:
-        entry = entry_map[number]
+    entry = entry_of(number)
+    if entry:
         email = entry.get("email")
         if email:
-            if not any(n.get("id") == email for n in nodes):
-                nodes.append({"id": email, "label": email})
+            add_node(email, email)
             edges.append({"from": number, "to": email, "label": "email"})
             relationships.append(
                 {
@@ -63,26 +75,22 @@ def build_relationship_map(
                 }
             )
             rel_logger.info("%s\t%s\t%s\t%s", number, email, "email", "mock dataset")
-            for pn, em in email_map.items():
-                if em == email and pn != number:
-                    add_relation(pn, entry_map.get(pn, {}).get("name"), "shared email", "mock dataset")
-                    edges.append({"from": email, "to": pn, "label": "shared email"})
+            for pn in dict.fromkeys(dataset.phones_for_email(email)):
+                if pn == number or entry_of(pn).get("email") != email:
+                    continue
+                add_relation(pn, name_of(pn), "shared email", "mock dataset")
+                edges.append({"from": email, "to": pn, "label": "shared email"})
         for conn in entry.get("connections", []):
-            target = entry_map.get(conn)
-            add_relation(
-                conn,
-                target.get("name") if target else None,
-                "known connection",
-                "mock dataset",
-            )
+            add_relation(conn, name_of(conn), "known connection", "mock dataset")
+
+    for pn in dataset.phones_connected_to(number):
+        if pn != number and number in entry_of(pn).get("connections", []):
+            add_relation(pn, name_of(pn), "linked connection", "mock dataset")
 
-    for pn, entry in entry_map.items():
-        if pn == number:
-            continue
-        if number in entry.get("connections", []):
-            add_relation(pn, entry.get("name"), "linked connection", "mock dataset")
-        if set(accounts) & set(entry.get("accounts", [])):
-            add_relation(pn, entry.get("name"), "shared social account", "mock dataset")
+    for acct in set(accounts):
+        for pn in dataset.phones_for_account(acct):
+            if pn != number and acct in entry_of(pn).get("accounts", []):
+                add_relation(pn, name_of(pn), "shared social account", "mock dataset")
 
     graph = {"nodes": nodes, "edges": edges}
     return relationships, graph
@@ -1,69 +1,207 @@
 import json
 import os
 import subprocess
-from typing import List, Dict
+import tempfile
+from typing import Dict, Hashable, List, Optional, Sequence
 import logging
 
-LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../logs"))
-os.makedirs(LOG_DIR, exist_ok=True)
+from ..core.config import settings
+from ..core.singleflight import SingleFlight
+from ..core.subprocess_pool import run_tool, run_tool_sync
+from ..core.ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# completed scans keyed by (tool, target, site set); each run takes 30-60 s
+_SCAN_CACHE = TTLCache(
+    maxsize=settings.scan_cache_size, ttl=settings.scan_cache_ttl, name="social_scans"
+)
+_SCAN_FLIGHTS = SingleFlight()
 
-def run_maigret(target: str) -> List[Dict]:
-    """Run Maigret CLI and return found accounts."""
+
+def _scan_key(tool: str, target: str, sites: Optional[Sequence[str]]) -> Hashable:
+    return (tool, target, tuple(sorted(set(sites))) if sites else None)
+
+
+def scan_cache_stats() -> Dict[str, int]:
+    """Return hit/miss counters of the Maigret/Sherlock result cache."""
+    return _SCAN_CACHE.stats()
+
+
+def _maigret_cmd(
+    target: str, out_file: str, sites: Optional[Sequence[str]] = None
+) -> List[str]:
+    cmd = ["maigret", target, "--json"]
+    if sites:
+        for site in sites:
+            cmd += ["--site", site]
+    else:
+        cmd.append("--top-sites")
+    return cmd + ["-o", out_file]
+
+
+def _sherlock_cmd(
+    username: str, out_file: str, sites: Optional[Sequence[str]] = None
+) -> List[str]:
+    cmd = ["sherlock", username, "--json", out_file]
+    for site in sites or []:
+        cmd += ["--site", site]
+    return cmd
+
+
+def _parse_maigret(out_file: str) -> List[Dict]:
+    """Return accounts from a Maigret JSON report."""
+    results: List[Dict] = []
+    if not os.path.exists(out_file):
+        return results
+    with open(out_file) as f:
+        data = json.load(f)
+    for site in data.get("sites", []):
+        url = site.get("url") or site.get("url_user")
+        if not url:
+            continue
+        results.append(
+            {
+                "platform": site.get("name"),
+                "username": site.get("id"),
+                "profile": url,
+                "status": site.get("status") or "unknown",
+            }
+        )
+    return results
+
+
+def _parse_sherlock(out_file: str, username: str) -> List[Dict]:
+    """Return accounts from a Sherlock JSON report."""
     results: List[Dict] = []
-    out_file = os.path.join(LOG_DIR, f"maigret_{target}.json")
-    cmd = ["maigret", target, "--json", "--top-sites", "-o", out_file]
+    if not os.path.exists(out_file):
+        return results
+    with open(out_file) as f:
+        data = json.load(f)
+    for site, entry in data.items():
+        url = entry.get("url")
+        if not url:
+            continue
+        results.append(
+            {
+                "platform": site,
+                "username": username,
+                "profile": url,
+                "status": entry.get("status", "unknown"),
+            }
+        )
+    return results
+
+
+def _check_report(proc: subprocess.CompletedProcess, out_file: str) -> None:
+    """Raise if the tool failed, so that its empty result is not cached."""
+    tool = proc.args[0]
+    if proc.returncode != 0:
+        detail = (proc.stderr or "").strip()[-200:]
+        raise RuntimeError(f"{tool} exited with status {proc.returncode}: {detail}")
+    if not os.path.exists(out_file):
+        raise RuntimeError(f"{tool} wrote no report")
+
+
+def _scan_maigret(target: str, sites: Optional[Sequence[str]]) -> List[Dict]:
+    with tempfile.TemporaryDirectory(prefix="maigret_") as workdir:
+        out_file = os.path.join(workdir, "report.json")
+        proc = run_tool_sync(
+            "maigret", _maigret_cmd(target, out_file, sites), cwd=workdir
+        )
+        _check_report(proc, out_file)
+        return _parse_maigret(out_file)
+
+
+def _scan_sherlock(username: str, sites: Optional[Sequence[str]]) -> List[Dict]:
+    with tempfile.TemporaryDirectory(prefix="sherlock_") as workdir:
+        out_file = os.path.join(workdir, "report.json")
+        proc = run_tool_sync(
+            "sherlock", _sherlock_cmd(username, out_file, sites), cwd=workdir
+        )
+        _check_report(proc, out_file)
+        return _parse_sherlock(out_file, username)
+
+
+async def _a_scan_maigret(target: str, sites: Optional[Sequence[str]]) -> List[Dict]:
+    with tempfile.TemporaryDirectory(prefix="maigret_") as workdir:
+        out_file = os.path.join(workdir, "report.json")
+        cmd = _maigret_cmd(target, out_file, sites)
+        _check_report(await run_tool("maigret", cmd, cwd=workdir), out_file)
+        return _parse_maigret(out_file)
+
+
+async def _a_scan_sherlock(username: str, sites: Optional[Sequence[str]]) -> List[Dict]:
+    with tempfile.TemporaryDirectory(prefix="sherlock_") as workdir:
+        out_file = os.path.join(workdir, "report.json")
+        cmd = _sherlock_cmd(username, out_file, sites)
+        _check_report(await run_tool("sherlock", cmd, cwd=workdir), out_file)
+        return _parse_sherlock(out_file, username)
+
+
+async def _a_cached_scan(key: Hashable, scan) -> List[Dict]:
+    """Return a cached scan result or run ``scan`` once for all callers."""
+    cached = _SCAN_CACHE.get(key)
+    if cached is not None:
+        return list(cached)
+
+    async def run() -> List[Dict]:
+        results = await scan()
+        _SCAN_CACHE.set(key, results)
+        return results
+
+    return list(await _SCAN_FLIGHTS.do(key, run))
+
+
+def run_maigret(target: str, sites: Optional[Sequence[str]] = None) -> List[Dict]:
+    """Run Maigret CLI and return found accounts."""
+    key = _scan_key("maigret", target, sites)
     try:
-        subprocess.run(cmd, capture_output=True, text=True, timeout=60, check=False)
-        if os.path.exists(out_file):
-            with open(out_file) as f:
-                data = json.load(f)
-            for site in data.get("sites", []):
-                url = site.get("url") or site.get("url_user")
-                if not url:
-                    continue
-                results.append(
-                    {
-                        "platform": site.get("name"),
-                        "username": site.get("id"),
-                        "profile": url,
-                        "status": site.get("status") or "unknown",
-                    }
-                )
-            os.remove(out_file)
+        return list(_SCAN_CACHE.get_or_set(key, lambda: _scan_maigret(target, sites)))
     except FileNotFoundError:
         logger.error("Maigret CLI not found. Please install maigret")
     except Exception as exc:  # noqa: BLE001
         logger.error("Maigret error: %s", exc)
-    return results
+    return []
 
 
-def run_sherlock(username: str) -> List[Dict]:
+def run_sherlock(username: str, sites: Optional[Sequence[str]] = None) -> List[Dict]:
     """Run Sherlock CLI and return found accounts."""
-    results: List[Dict] = []
-    out_file = os.path.join(LOG_DIR, f"sherlock_{username}.json")
-    cmd = ["sherlock", username, "--json", out_file]
+    key = _scan_key("sherlock", username, sites)
     try:
-        subprocess.run(cmd, capture_output=True, text=True, timeout=60, check=False)
-        if os.path.exists(out_file):
-            with open(out_file) as f:
-                data = json.load(f)
-            for site, entry in data.items():
-                url = entry.get("url")
-                if not url:
-                    continue
-                results.append(
-                    {
-                        "platform": site,
-                        "username": username,
-                        "profile": url,
-                        "status": entry.get("status", "unknown"),
-                    }
-                )
-            os.remove(out_file)
+        return list(
+            _SCAN_CACHE.get_or_set(key, lambda: _scan_sherlock(username, sites))
+        )
     except FileNotFoundError:
         logger.error("Sherlock CLI not found. Please install sherlock")
     except Exception as exc:  # noqa: BLE001
         logger.error("Sherlock error: %s", exc)
-    return results
+    return []
+
+
+async def a_run_maigret(
+    target: str, sites: Optional[Sequence[str]] = None
+) -> List[Dict]:
+    """Async variant of :func:`run_maigret` using the bounded tool runner."""
+    key = _scan_key("maigret", target, sites)
+    try:
+        return await _a_cached_scan(key, lambda: _a_scan_maigret(target, sites))
+    except FileNotFoundError:
+        logger.error("Maigret CLI not found. Please install maigret")
+    except Exception as exc:  # noqa: BLE001
+        logger.error("Maigret error: %s", exc)
+    return []
+
+
+async def a_run_sherlock(
+    username: str, sites: Optional[Sequence[str]] = None
+) -> List[Dict]:
+    """Async variant of :func:`run_sherlock` using the bounded tool runner."""
+    key = _scan_key("sherlock", username, sites)
+    try:
+        return await _a_cached_scan(key, lambda: _a_scan_sherlock(username, sites))
+    except FileNotFoundError:
+        logger.error("Sherlock CLI not found. Please install sherlock")
+    except Exception as exc:  # noqa: BLE001
+        logger.error("Sherlock error: %s", exc)
+    return []
@@ -0,0 +1,49 @@
+from app.core.cache import ResultCache
+from app.core.config import settings
+
+
+def test_result_cache_ttl_and_lru(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "database_url", str(tmp_path / "cache.db"))
+
+    cache = ResultCache("test", ttl=60, max_entries=2)
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+
+    cache.set("c", {"value": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("c") == {"value": 3}
+
+    cache.set("expired", {"value": 4}, ttl=-1)
+    assert cache.get("expired") is None
+
+    # entries persist for a fresh instance on the same database
+    assert ResultCache("test").get("c") == {"value": 3}
+
+
+def test_ttl_cache_get_or_set_computes_once_for_concurrent_callers():
+    import threading
+    import time
+
+    from app.core.ttl_cache import TTLCache
+
+    cache = TTLCache(maxsize=8, ttl=60)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"rows": []}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_set("k", factory)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [{"rows": []}] * 8
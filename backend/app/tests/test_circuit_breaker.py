@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def test_breaker_opens_and_recovers_after_probe():
+    breaker = CircuitBreaker(
+        "test", failure_rate=0.5, min_calls=4, window=60, reset_timeout=0.05
+    )
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_success()
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()  # the single half-open probe
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.status() == {"state": "closed", "calls": 1, "failures": 0}
+
+
+def test_open_breaker_fails_fast_and_shows_in_health(monkeypatch):
+    import asyncio
+
+    import httpx
+    from fastapi.testclient import TestClient
+
+    from app.core import circuit_breaker
+    from app.main import app
+    from app.services import phone_service
+
+    sent = []
+
+    def handler(request):
+        sent.append(request.url.host)
+        return httpx.Response(503)
+
+    monkeypatch.setenv("TRUECALLER_API_KEY", "test")
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    monkeypatch.setattr(
+        circuit_breaker,
+        "get_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(
+        circuit_breaker.requests,
+        "get",
+        lambda *args, **kwargs: pytest.fail("sync call made while open"),
+    )
+
+    async def lookups():
+        for _ in range(circuit_breaker.settings.breaker_min_calls):
+            assert await phone_service._a_query_truecaller("+14155552671") is None
+        with pytest.raises(CircuitOpenError):
+            await phone_service._a_query_truecaller("+14155552671")
+
+    asyncio.run(lookups())
+    assert len(sent) == circuit_breaker.settings.breaker_min_calls
+    assert phone_service._query_truecaller("+14155552671") is None
+
+    health = TestClient(app).get("/api/health").json()
+    assert health["circuit_breakers"]["truecaller"]["state"] == "open"
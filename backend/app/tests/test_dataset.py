@@ -0,0 +1,80 @@
+import json
+import os
+
+from app.services.dataset_service import Dataset
+
+
+def _write(path, entries):
+    with open(path, "w") as f:
+        json.dump(entries, f)
+
+
+def test_dataset_indexes_and_reload(tmp_path):
+    path = tmp_path / "data.json"
+    _write(
+        path,
+        [
+            {
+                "phone_number": "+1",
+                "email": "a@example.com",
+                "accounts": ["twitter:alice"],
+                "connections": ["+2"],
+            }
+        ],
+    )
+    dataset = Dataset(str(path))
+    assert dataset.emails_for_phone("+1") == ["a@example.com"]
+    assert dataset.phones_for_email("a@example.com") == ["+1"]
+    assert dataset.phones_for_username("alice") == ["+1"]
+    assert dataset.phones_connected_to("+2") == ["+1"]
+
+    _write(path, [{"phone_number": "+3", "email": "a@example.com"}])
+    os.utime(path, ns=(0, 1))
+    assert dataset.phones_for_email("a@example.com") == ["+3"]
+    assert dataset.entry("+1") is None
+
+
+def test_relationship_map_edges_without_duplicates(tmp_path, monkeypatch):
+    from app.services import relationship_service
+
+    path = tmp_path / "data.json"
+    _write(
+        path,
+        [
+            {
+                "phone_number": "+1",
+                "email": "a@example.com",
+                "accounts": ["twitter:alice"],
+                "connections": ["+2"],
+            },
+            {"phone_number": "+3", "name": "Old", "email": "a@example.com"},
+            {"phone_number": "+3", "name": "New", "email": "a@example.com"},
+            {"phone_number": "+2", "name": "Friend", "connections": ["+1"]},
+            {"phone_number": "+4", "name": "Alias", "accounts": ["twitter:alice"]},
+        ],
+    )
+    dataset = Dataset(str(path))
+    monkeypatch.setattr(relationship_service, "get_dataset", lambda: dataset)
+
+    relationships, graph = relationship_service.build_relationship_map(
+        "+1", ["twitter:alice", "twitter:alice"], []
+    )
+    assert [
+        (r.get("phone_number"), r.get("name"), r["relationship"]) for r in relationships
+    ] == [
+        (None, None, "associated email"),
+        ("+3", "New", "shared email"),
+        ("+2", "Friend", "known connection"),
+        ("+2", "Friend", "linked connection"),
+        ("+4", "Alias", "shared social account"),
+    ]
+    assert [n["id"] for n in graph["nodes"]] == [
+        "+1",
+        "a@example.com",
+        "+3",
+        "+2",
+        "+4",
+    ]
+    edges = [(e["from"], e["to"], e["label"]) for e in graph["edges"]]
+    assert len(edges) == len(set(edges)) == 6
+    assert ("a@example.com", "+3", "shared email") in edges
@@ -0,0 +1,45 @@
+import asyncio
+
+import httpx
+
+from app.services.html_service import _StopScanner, fetch_page_images, parse_images
+
+
+def test_scanner_waits_for_img_tag_split_across_chunks():
+    scanner = _StopScanner(max_images=1)
+    buf = b"<html><head><title>x</title></head><body><img "
+    assert not scanner.feed(buf)
+    buf += b'alt="a > b" src="https://cdn.example/'
+    assert not scanner.feed(buf)
+    buf += b'avatar.png"></body>'
+    assert scanner.feed(buf)
+    assert parse_images(buf.decode()) == {
+        "image": "https://cdn.example/avatar.png",
+        "images": ["https://cdn.example/avatar.png"],
+    }
+
+
+def test_fetch_skips_images_that_are_not_reported():
+    page = (
+        b"<html><body>"
+        b'<img src="data:image/gif;base64,R0lGOD">'
+        b'<img src="/static/logo.png">'
+        + b"".join(b'<img src="https://img.example/%d.jpg">' % i for i in range(4))
+        + b"</body></html>"
+    )
+
+    async def chunks():
+        for start in range(0, len(page), 7):
+            stop = start + 7
+            yield page[start:stop]
+
+    def handler(request):
+        return httpx.Response(200, content=chunks())
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_page_images(client, "https://site.test/u", 3)
+
+    result = asyncio.run(run())
+    assert result["images"] == [f"https://img.example/{i}.jpg" for i in range(3)]
+    assert result["image"].startswith("data:")
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import httpx
+
+from app.core.http import HostLimitedTransport, retry_after_seconds
+
+
+def test_host_waits_out_retry_after(monkeypatch):
+    sent = []
+
+    async def fake_send(self, request):
+        sent.append(time.monotonic())
+        if len(sent) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.2"})
+        return httpx.Response(200)
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", fake_send)
+
+    async def run():
+        transport = HostLimitedTransport(2, rate=100, burst=10)
+        async with httpx.AsyncClient(transport=transport) as client:
+            first = await client.get("http://limited.test/")
+            second = await client.get("http://limited.test/")
+            other = await client.get("http://other.test/")
+        return first, second, other, transport
+
+    first, second, other, transport = asyncio.run(run())
+    assert (first.status_code, second.status_code, other.status_code) == (
+        429,
+        200,
+        200,
+    )
+    assert sent[1] - sent[0] >= 0.19
+    assert sent[2] - sent[1] < 0.1
+    assert transport.throttle("limited.test").rate < 100
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds("3") == 3.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(None) is None
+
+
+def test_sync_wrapper_closes_its_client_and_keeps_app_client():
+    from app.core import http
+
+    async def app_loop():
+        client = await http.start_http_client()
+        seen = []
+
+        async def borrow():
+            seen.append(http.get_http_client())
+            return "done"
+
+        # a synchronous wrapper called from a worker thread of the app
+        result = await asyncio.to_thread(http.run_with_http_client, borrow())
+        assert http.get_http_client() is client
+        await http.close_http_client()
+        return result, seen[0], client
+
+    result, wrapper_client, app_client = asyncio.run(app_loop())
+    assert result == "done"
+    assert wrapper_client is not app_client
+    assert wrapper_client.is_closed and app_client.is_closed
+
+
+def test_backoff_is_shared_between_clients(monkeypatch):
+    sent = []
+
+    async def fake_send(self, request):
+        sent.append(time.monotonic())
+        if len(sent) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.2"})
+        return httpx.Response(200)
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", fake_send)
+
+    async def get(url):
+        async with httpx.AsyncClient(transport=HostLimitedTransport(2)) as client:
+            return await client.get(url)
+
+    # e.g. the app loop and a synchronous wrapper's loop
+    assert asyncio.run(get("http://shared.test/")).status_code == 429
+    assert asyncio.run(get("http://shared.test/")).status_code == 200
+    assert sent[1] - sent[0] >= 0.19
@@ -1,3 +1,4 @@
+import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -19,3 +20,273 @@ def test_analyze_image(monkeypatch):
     resp = client.post("/api/analyze-image", files={"file": ("test.jpg", b"data")})
     assert resp.status_code == 200
     assert resp.json()["status"] == "success"
+
+
+async def _fake_queue_full(data: bytes):
+    from app.services.image_service import ImageQueueFull
+
+    raise ImageQueueFull("image analysis queue is full")
+
+
+def test_analyze_image_queue_full(monkeypatch):
+    from app.routers import image as image_router
+
+    monkeypatch.setattr(image_router, "a_analyze_image_bytes", _fake_queue_full)
+    client = TestClient(app)
+    resp = client.post("/api/analyze-image", files={"file": ("test.jpg", b"data")})
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "error"
+
+
+async def _fake_batch(images):
+    for name, data in images:
+        if data == b"bad":
+            yield name, None, "UnidentifiedImageError: cannot identify image file"
+        else:
+            yield name, {"dimensions": "1x1", "format": "PNG"}, None
+
+
+def test_analyze_images_batch(monkeypatch):
+    import io
+    import json
+    import zipfile
+    from app.routers import image as image_router
+
+    monkeypatch.setattr(image_router, "a_analyze_image_batch", _fake_batch)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.png", b"data")
+        zf.writestr("b.png", b"bad")
+        zf.writestr("notes.txt", b"not an image")
+    client = TestClient(app)
+    resp = client.post(
+        "/api/analyze-images",
+        files=[
+            ("files", ("one.jpg", b"data")),
+            ("files", ("dump.zip", archive.getvalue())),
+        ],
+    )
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    status = {line["file"]: line["status"] for line in lines}
+    assert status == {
+        "one.jpg": "success",
+        "dump.zip/a.png": "success",
+        "dump.zip/b.png": "error",
+    }
+
+
+def test_analyze_images_rejects_oversized_zip_member(monkeypatch):
+    import io
+    import zipfile
+    from app.core.config import settings
+    from app.routers import image as image_router
+
+    monkeypatch.setattr(image_router, "a_analyze_image_batch", _fake_batch)
+    monkeypatch.setattr(settings, "image_zip_max_member_bytes", 1024)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("small.png", b"data")
+        zf.writestr("bomb.png", b"\0" * 10_000_000)
+    client = TestClient(app)
+    resp = client.post(
+        "/api/analyze-images", files=[("files", ("dump.zip", archive.getvalue()))]
+    )
+    assert resp.status_code == 413
+    assert "bomb.png" in resp.json()["detail"]
+
+
+def test_submit_restarts_broken_pool(monkeypatch):
+    import asyncio
+    from concurrent.futures import Executor, Future
+    from concurrent.futures.process import BrokenProcessPool
+    from app.core.config import settings
+    from app.services import image_service
+
+    created = []
+
+    class FakePool(Executor):
+        def __init__(self, **kwargs):
+            self.broken = not created
+            self.closed = False
+            created.append(self)
+
+        def submit(self, fn, *args):
+            future = Future()
+            if self.broken:
+                future.set_exception(BrokenProcessPool("worker died"))
+            else:
+                future.set_result(fn(*args))
+            return future
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.closed = True
+
+    monkeypatch.setattr(settings, "image_workers", 1)
+    monkeypatch.setattr(image_service, "ProcessPoolExecutor", FakePool)
+    monkeypatch.setattr(image_service, "_pool", None)
+
+    async def run():
+        return await image_service._submit(len, b"abc", "single")
+
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(run())
+    assert created[0].closed
+    assert image_service._pool is None
+    assert image_service._pending == 0
+
+    assert asyncio.run(run()) == 3
+    assert len(created) == 2
+    assert image_service._pool is created[1]
+    assert image_service._pending == 0
+
+
+def test_submit_rejects_when_queue_is_full(monkeypatch):
+    import asyncio
+    from app.core.config import settings
+    from app.services import image_service
+
+    monkeypatch.setattr(settings, "image_workers", 0)
+    monkeypatch.setattr(settings, "image_queue_limit", 0)
+    monkeypatch.setattr(image_service, "_pending", 1)
+    with pytest.raises(image_service.ImageQueueFull):
+        asyncio.run(image_service._submit(len, b"abc", "single"))
+    assert image_service._pending == 1
+
+
+def _isolate_cache(monkeypatch, tmp_path):
+    """Point the image caches at a fresh database and count worker runs."""
+    import time
+    from app.core.config import settings
+    from app.core.singleflight import SingleFlight
+    from app.core.ttl_cache import TTLCache
+    from app.services import image_service
+
+    monkeypatch.setattr(settings, "database_url", str(tmp_path / "image.db"))
+    monkeypatch.setattr(settings, "image_workers", 0)
+    monkeypatch.setattr(image_service, "_MEMORY_CACHE", TTLCache(maxsize=8, ttl=60))
+    monkeypatch.setattr(image_service, "_FLIGHTS", SingleFlight())
+    calls = []
+
+    def fake_worker(data):
+        calls.append(data)
+        time.sleep(0.05)
+        return {"dimensions": "1x1", "face_locations": [[1, 2, 3, 4]]}
+
+    monkeypatch.setattr(image_service, "_analyze_in_worker", fake_worker)
+    return image_service, calls
+
+
+def test_image_cache_reuses_results_for_identical_bytes(monkeypatch, tmp_path):
+    import asyncio
+
+    image_service, calls = _isolate_cache(monkeypatch, tmp_path)
+
+    first = asyncio.run(image_service.a_analyze_image_bytes(b"same"))
+    second = asyncio.run(image_service.a_analyze_image_bytes(b"same"))
+    assert first == second
+    assert len(calls) == 1
+
+    # the disk tier answers once the memory tier is gone
+    image_service._MEMORY_CACHE.clear()
+    assert asyncio.run(image_service.a_analyze_image_bytes(b"same")) == first
+    assert len(calls) == 1
+
+
+def test_image_cache_coalesces_concurrent_submissions(monkeypatch, tmp_path):
+    import asyncio
+
+    image_service, calls = _isolate_cache(monkeypatch, tmp_path)
+
+    async def run():
+        return await asyncio.gather(
+            *(image_service.a_analyze_image_bytes(b"same") for _ in range(5))
+        )
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_image_cache_misses_after_version_bump(monkeypatch, tmp_path):
+    import asyncio
+
+    image_service, calls = _isolate_cache(monkeypatch, tmp_path)
+
+    asyncio.run(image_service.a_analyze_image_bytes(b"same"))
+    monkeypatch.setattr(image_service, "_ANALYSIS_VERSION", "next")
+    asyncio.run(image_service.a_analyze_image_bytes(b"same"))
+    assert len(calls) == 2
+
+
+def test_image_cache_returns_independent_copies(monkeypatch, tmp_path):
+    import asyncio
+
+    image_service, calls = _isolate_cache(monkeypatch, tmp_path)
+
+    result = asyncio.run(image_service.a_analyze_image_bytes(b"same"))
+    result["dimensions"] = "changed"
+    result["face_locations"].append([0, 0, 0, 0])
+
+    cached = asyncio.run(image_service.a_analyze_image_bytes(b"same"))
+    assert cached == {"dimensions": "1x1", "face_locations": [[1, 2, 3, 4]]}
+    assert len(calls) == 1
+
+
+def test_large_jpeg_is_downscaled_and_boxes_are_mapped_back(monkeypatch):
+    import io
+    from PIL import Image
+    from app.core.config import settings
+    from app.services import image_service
+
+    buf = io.BytesIO()
+    Image.new("RGB", (4000, 3000), (200, 120, 40)).save(buf, "JPEG")
+    monkeypatch.setattr(settings, "image_ocr_max_pixels", 1_000_000)
+    monkeypatch.setattr(settings, "image_detect_max_pixels", 250_000)
+    seen = {}
+
+    class FakeTesseract:
+        @staticmethod
+        def image_to_string(img):
+            seen["ocr"] = img.size
+            return "found on instagram"
+
+    class FakeFaces:
+        @staticmethod
+        def face_locations(arr):
+            seen["faces"] = arr.shape
+            return [(10, 40, 30, 20)]
+
+    class FakeCv:
+        @staticmethod
+        def detect_common_objects(arr, confidence, model):
+            seen["objects"] = arr.shape
+            return [[5, 6, 15, 16]], ["person"], [0.91234]
+
+    monkeypatch.setattr(image_service, "pytesseract", FakeTesseract)
+    monkeypatch.setattr(image_service, "_face_recognition", FakeFaces)
+    monkeypatch.setattr(image_service, "_cv", FakeCv)
+    monkeypatch.setattr(image_service, "_models_loaded", True)
+
+    result = image_service._analyze_image_bytes(buf.getvalue())
+
+    ocr_w, ocr_h = seen["ocr"]
+    assert ocr_w * ocr_h <= settings.image_ocr_max_pixels
+    det_h, det_w, _ = seen["faces"]
+    assert det_w * det_h <= settings.image_detect_max_pixels
+    assert seen["objects"] == seen["faces"]
+
+    sx, sy = 4000 / det_w, 3000 / det_h
+    assert result["dimensions"] == "4000x3000"
+    assert result["inferred_platform"] == "Instagram"
+    assert result["faces_detected"] == 1
+    assert result["face_locations"] == [
+        [round(10 * sy), round(40 * sx), round(30 * sy), round(20 * sx)]
+    ]
+    assert result["object_boxes"] == [
+        {
+            "label": "person",
+            "confidence": 0.912,
+            "box": [round(5 * sx), round(6 * sy), round(15 * sx), round(16 * sy)],
+        }
+    ]
@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+from app.main import app
+
+TEXT = b"Call +14155552671 or mail user@example.com, again user@example.com"
+
+
+async def _fake_scan(phones, emails):
+    return {"phones": phones, "emails": emails, "images": []}
+
+
+def test_integrated_scan_upload(monkeypatch):
+    from app.routers import integration as integration_router
+
+    monkeypatch.setattr(integration_router, "scan_contacts", _fake_scan)
+    client = TestClient(app)
+    resp = client.post(
+        "/api/integrated-scan/upload", files={"file": ("chat.txt", TEXT)}
+    )
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert data["phones"] == ["+14155552671"]
+    assert data["emails"] == ["user@example.com"]
+
+
+def test_integrated_scan_raw(monkeypatch):
+    from app.routers import integration as integration_router
+
+    monkeypatch.setattr(integration_router, "scan_contacts", _fake_scan)
+    client = TestClient(app)
+    resp = client.post("/api/integrated-scan/raw", content=TEXT)
+    assert resp.status_code == 200
+    assert resp.json()["data"]["emails"] == ["user@example.com"]
@@ -0,0 +1,80 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+
+
+async def _fake_smart_lookup(job_id, params):
+    return {"phone": params["phone"], "depth": params["depth"]}
+
+
+def test_job_lifecycle(tmp_path, monkeypatch):
+    from app.services import job_service
+
+    monkeypatch.setattr(settings, "database_url", str(tmp_path / "jobs.db"))
+    monkeypatch.setitem(job_service.JOB_HANDLERS, "smart_lookup", _fake_smart_lookup)
+    client = TestClient(app)
+
+    resp = client.post(
+        "/api/jobs", json={"kind": "smart_lookup", "params": {"phone": "+123"}}
+    )
+    assert resp.status_code == 202
+    job_id = resp.json()["data"]["id"]
+    assert client.get(f"/api/jobs/{job_id}").json()["data"]["status"] == "queued"
+    assert client.get(f"/api/jobs/{job_id}/result").status_code == 202
+
+    assert asyncio.run(job_service.run_next_job()) is True
+    assert asyncio.run(job_service.run_next_job()) is False
+
+    resp = client.get(f"/api/jobs/{job_id}/result")
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert data["status"] == "succeeded"
+    assert data["result"] == {"phone": "+123", "depth": 2}
+
+
+def test_job_rejects_bad_params():
+    client = TestClient(app)
+    assert client.post("/api/jobs", json={"kind": "nope"}).status_code == 400
+    resp = client.post("/api/jobs", json={"kind": "enrichment", "params": {}})
+    assert resp.status_code == 422
+
+
+def test_enrichment_stages_are_written_in_order(tmp_path, monkeypatch):
+    from app.services import job_service
+
+    async def fake_enrichment(phone_number, progress_cb):
+        for stage in ("phone", "emails", "accounts", "complete"):
+            progress_cb(stage, None)
+            await asyncio.sleep(0)
+        return {"phone": phone_number}
+
+    monkeypatch.setattr(settings, "database_url", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(job_service, "run_enrichment", fake_enrichment)
+    job = job_service.submit_job("enrichment", {"phone_number": "+123"})
+    assert asyncio.run(job_service.run_next_job()) is True
+    done = job_service.get_job(job["id"], with_result=True)
+    assert (done["status"], done["stage"], done["attempts"]) == (
+        "succeeded",
+        "complete",
+        1,
+    )
+
+
+def test_job_crashing_its_worker_is_failed(tmp_path, monkeypatch):
+    from contextlib import closing
+    from app.services import job_service
+
+    monkeypatch.setattr(settings, "database_url", str(tmp_path / "jobs.db"))
+    job = job_service.submit_job("smart_lookup", {"phone": "+123"})
+    # the last worker to claim it died and its lease has run out
+    with closing(job_service._connect()) as conn, conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'running', lease_expires = 0, attempts = ?",
+            (settings.job_max_attempts,),
+        )
+    assert asyncio.run(job_service.run_next_job()) is False
+    failed = job_service.get_job(job["id"])
+    assert failed["status"] == "failed"
+    assert "attempts" in failed["error"]
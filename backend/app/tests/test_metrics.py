@@ -0,0 +1,31 @@
+from fastapi.testclient import TestClient
+from app.core.metrics import Counter, Histogram, Registry
+from app.main import app
+
+
+def test_metrics_endpoint_reports_route_latency():
+    client = TestClient(app)
+    assert client.get("/api/health").status_code == 200
+    resp = client.get("/api/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert (
+        'forensitrain_http_request_duration_seconds_count{method="GET",'
+        'route="/api/health",status="200"}' in resp.text
+    )
+
+
+def test_histogram_rendering(monkeypatch):
+    from app.core import metrics
+
+    monkeypatch.setattr(metrics, "REGISTRY", Registry())
+    latency = Histogram("t_seconds", "Test latency.", ("source",), buckets=(0.1, 1))
+    errors = Counter("t_errors_total", "Test errors.", ("source",))
+    latency.observe(0.05, source="hibp")
+    latency.observe(0.5, source="hibp")
+    errors.inc(source="hibp")
+    text = metrics.REGISTRY.render()
+    assert 't_seconds_bucket{source="hibp",le="0.1"} 1' in text
+    assert 't_seconds_bucket{source="hibp",le="+Inf"} 2' in text
+    assert 't_seconds_count{source="hibp"} 2' in text
+    assert 't_errors_total{source="hibp"} 1' in text
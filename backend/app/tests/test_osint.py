@@ -2,7 +2,7 @@ from fastapi.testclient import TestClient
 from app.main import app
 
 
-def _fake_smart(phone: str):
+async def _fake_smart(phone: str):
     return {"dummy": True}
 
 
@@ -13,7 +13,7 @@ def _fake_footprint(phone: str):
 def test_smart_lookup(monkeypatch):
     from app.routers import osint as osint_router
 
-    monkeypatch.setattr(osint_router, "smart_osint_lookup", _fake_smart)
+    monkeypatch.setattr(osint_router, "a_smart_osint_lookup", _fake_smart)
     client = TestClient(app)
     resp = client.post("/api/osint/smart-lookup", json={"phone": "123"})
     assert resp.status_code == 200
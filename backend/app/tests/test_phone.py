@@ -38,3 +38,216 @@ def test_enrich_phone(monkeypatch):
     resp = client.post("/api/phone/enrich", json={"phone_number": "123"})
     assert resp.status_code == 200
     assert resp.json()["status"] == "success"
+
+
+def test_analyze_bulk_upload(monkeypatch):
+    import json
+    from app.services import phone_service
+
+    async def _fake_source_lookup(number: str):
+        if number.endswith("3"):
+            raise RuntimeError("source down")
+        return await _fake_lookup(number)
+
+    monkeypatch.setattr(phone_service, "multi_source_lookup", _fake_source_lookup)
+    csv_data = (
+        "date,caller,duration\n"
+        "2024-01-01,+14155552671,30\n"
+        "2024-01-02,+1 415 555 2671,12\n"
+        "2024-01-03,+14155552673,5\n"
+        "2024-01-04,not-a-number,5\n"
+    )
+    client = TestClient(app)
+    resp = client.post(
+        "/api/phone/analyze-bulk/upload",
+        files={"file": ("calls.csv", csv_data.encode())},
+    )
+    assert resp.status_code == 200
+    items = [json.loads(line) for line in resp.text.splitlines()]
+    by_number = {item["phone_number"]: item for item in items}
+    assert len(items) == 3
+    assert by_number["+14155552671"]["status"] == "success"
+    assert by_number["+14155552671"]["inputs"] == ["+14155552671", "+1 415 555 2671"]
+    assert by_number["+14155552673"]["status"] == "error"
+    assert by_number[None]["inputs"] == ["not-a-number"]
+
+
+def test_analyze_stream_emits_sources_first(monkeypatch):
+    import json
+    from app.services import phone_service
+
+    async def _fake_hibp(number):
+        return ["ExampleBreach"]
+
+    async def _fake_truecaller(number):
+        raise RuntimeError("source down")
+
+    async def _no_data(number, sink=None):
+        return None
+
+    async def _fake_map(*args):
+        return [], {}
+
+    monkeypatch.setattr(phone_service, "_collect_social_profiles", _no_data)
+    monkeypatch.setattr(phone_service, "_collect_emails", _no_data)
+    monkeypatch.setattr(phone_service, "_a_query_hibp", _fake_hibp)
+    monkeypatch.setattr(phone_service, "_a_query_truecaller", _fake_truecaller)
+    monkeypatch.setattr(phone_service, "_a_query_numlookup", _no_data)
+    monkeypatch.setattr(phone_service, "_a_build_relationship_map", _fake_map)
+    monkeypatch.setattr(phone_service.LOOKUP_CACHE, "get", lambda key: None)
+    monkeypatch.setattr(phone_service.LOOKUP_CACHE, "set", lambda key, value: None)
+    client = TestClient(app)
+    resp = client.post(
+        "/api/phone/analyze-stream", json={"phone_number": "+14155552671"}
+    )
+    assert resp.status_code == 200
+    events = [json.loads(line) for line in resp.text.splitlines()]
+    sources = {e["source"]: e for e in events[:-1]}
+    assert set(sources) == {"social", "hibp", "emails", "truecaller", "numlookup"}
+    assert sources["hibp"]["data"] == ["ExampleBreach"]
+    assert sources["truecaller"]["error"] == "source down"
+    final = events[-1]
+    assert final["event"] == "result"
+    assert final["response"]["data"]["breaches"] == ["ExampleBreach"]
+    assert final["response"]["errors"] == {"truecaller": "source down"}
+    assert final["confidence"] == 0.4
+
+
+def test_numbers_from_csv_ignores_non_phone_number_columns():
+    from app.routers.phone import _numbers_from_csv
+
+    csv_data = "case number,account number,Caller ID\n17,42,+14155552671\n"
+    assert _numbers_from_csv(csv_data) == ["+14155552671"]
+    assert _numbers_from_csv(csv_data, "2") == ["+14155552671"]
+    assert _numbers_from_csv("+14155552671,x\n", "0") == ["+14155552671"]
+
+
+def _patch_fast_sources(monkeypatch, phone_service, cache_writes):
+    async def _none(number, sink=None):
+        return None
+
+    async def _fake_map(*args):
+        return [], {}
+
+    for name in (
+        "_collect_social_profiles",
+        "_collect_emails",
+        "_a_query_hibp",
+        "_a_query_truecaller",
+        "_a_query_numlookup",
+    ):
+        monkeypatch.setattr(phone_service, name, _none)
+    monkeypatch.setattr(phone_service, "_a_build_relationship_map", _fake_map)
+    monkeypatch.setattr(phone_service.LOOKUP_CACHE, "get", lambda key: None)
+    monkeypatch.setattr(
+        phone_service.LOOKUP_CACHE, "set", lambda key, value: cache_writes.append(key)
+    )
+
+
+def test_lookup_budget_returns_partial_data_and_skips_cache(monkeypatch):
+    import asyncio
+    from app.services import phone_service
+
+    cache_writes = []
+    _patch_fast_sources(monkeypatch, phone_service, cache_writes)
+    profile = {"profile_url": "https://github.com/user", "profile_picture": None}
+
+    async def slow_social(number, sink=None):
+        sink["social"] = [profile]  # accounts found, avatars still loading
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(phone_service, "_collect_social_profiles", slow_social)
+
+    async def run():
+        resp = await phone_service.multi_source_lookup(
+            "+14155552671", budget=0.2, finish_in_background=False
+        )
+        return resp, set(phone_service._BACKGROUND)
+
+    resp, background = asyncio.run(run())
+    assert resp["errors"] == {"social": "timeout"}
+    assert resp["data"]["accounts"] == ["https://github.com/user"]
+    assert cache_writes == []
+    assert background == set()
+
+    async def fast_social(number, sink=None):
+        return [profile]
+
+    monkeypatch.setattr(phone_service, "_collect_social_profiles", fast_social)
+    resp = asyncio.run(phone_service.multi_source_lookup("+14155552671", budget=1))
+    assert resp["errors"] is None
+    assert cache_writes == ["+14155552671"]
+
+
+def test_lookup_source_deadline_cancels_or_finishes_late_source(monkeypatch):
+    import asyncio
+    from app.services import phone_service
+
+    _patch_fast_sources(monkeypatch, phone_service, [])
+    outcome = []
+
+    async def slow_hibp(number):
+        try:
+            await asyncio.sleep(0.3)
+        except asyncio.CancelledError:
+            outcome.append("cancelled")
+            raise
+        outcome.append("finished")
+        return ["LateBreach"]
+
+    monkeypatch.setattr(phone_service, "_a_query_hibp", slow_hibp)
+
+    async def run(finish_in_background):
+        resp = await phone_service.multi_source_lookup(
+            "+14155552671",
+            budget=5,
+            source_timeouts={"hibp": 0.05},
+            finish_in_background=finish_in_background,
+        )
+        await asyncio.sleep(0.4)
+        return resp
+
+    resp = asyncio.run(run(False))
+    assert resp["errors"] == {"hibp": "timeout"}
+    assert resp["data"]["breaches"] == []
+    assert outcome == ["cancelled"]
+
+    outcome.clear()
+    asyncio.run(run(True))
+    assert outcome == ["finished"]
+
+
+def test_bulk_lookup_uses_a_fixed_worker_pool(monkeypatch):
+    import asyncio
+    from app.core.config import settings
+    from app.services import phone_service
+
+    monkeypatch.setattr(settings, "bulk_concurrency", 3)
+    in_flight = []
+    peak = []
+
+    async def _slow_lookup(number: str):
+        in_flight.append(number)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(number)
+        if number.endswith("05"):
+            raise RuntimeError("source down")
+        return await _fake_lookup(number)
+
+    monkeypatch.setattr(phone_service, "multi_source_lookup", _slow_lookup)
+    numbers = [f"+141555526{i:02d}" for i in range(20)]
+
+    async def run():
+        tasks_before = len(asyncio.all_tasks())
+        items = []
+        async for item in phone_service.a_bulk_lookup(numbers):
+            items.append(item)
+            assert len(asyncio.all_tasks()) - tasks_before <= 3
+        return items
+
+    items = asyncio.run(run())
+    assert max(peak) == 3
+    assert sorted(item["phone_number"] for item in items) == numbers
+    failed = [item for item in items if item["status"] == "error"]
+    assert [item["phone_number"] for item in failed] == ["+14155552605"]
@@ -0,0 +1,42 @@
+from app.services import phone_meta_service
+from app.services.phone_meta_service import normalize_phone, parse_phone, parse_phones
+
+
+def test_unparseable_input_is_reported_invalid():
+    assert normalize_phone("not-a-number") is None
+    assert parse_phone("not-a-number") == {
+        "phone": "not-a-number",
+        "valid": False,
+        "country": "Unknown",
+        "carrier": None,
+        "line_type": None,
+    }
+
+
+def test_normalize_phone_uses_region_for_national_numbers():
+    assert normalize_phone("(415) 555-2671", "US") == "+14155552671"
+    assert normalize_phone(" 020 7946 0018 ", "GB") == "+442079460018"
+    assert normalize_phone("+1 415 555 2671", "GB") == "+14155552671"
+    assert normalize_phone("415 555 2671") is None
+
+
+def test_spellings_of_one_number_share_a_metadata_lookup():
+    phone_meta_service._to_e164.cache_clear()
+    phone_meta_service._metadata.cache_clear()
+
+    parse_phones(["+1 415 555 2671", "+14155552671", "+1 415 555 2671"])
+    parse_phone("+1 (415) 555-2671")
+
+    assert phone_meta_service._to_e164.cache_info().misses == 3
+    assert phone_meta_service._metadata.cache_info().misses == 1
+
+
+def test_parse_phones_matches_parse_phone():
+    numbers = ["+14155552671", "bogus", "+442079460018", "+14155552671"]
+
+    results = parse_phones(numbers)
+    assert results == [parse_phone(number) for number in numbers]
+
+    # duplicates get their own dict
+    results[0]["valid"] = None
+    assert results[3]["valid"] is True
@@ -0,0 +1,26 @@
+import asyncio
+
+from app.core.singleflight import single_flight
+
+
+def test_concurrent_calls_share_one_run():
+    calls = []
+
+    @single_flight
+    async def lookup(number: str):
+        calls.append(number)
+        await asyncio.sleep(0.01)
+        return {"number": number}
+
+    async def main():
+        return await asyncio.gather(
+            lookup("+1"), lookup("+1"), lookup("+1"), lookup("+2")
+        )
+
+    results = asyncio.run(main())
+    assert calls == ["+1", "+2"]
+    assert results[0] == results[1] == results[2] == {"number": "+1"}
+    # each caller gets its own copy to mutate
+    results[0]["number"] = "changed"
+    assert results[1] == {"number": "+1"}
+    assert len(lookup.flights) == 0
@@ -19,3 +19,46 @@ def test_deep_scan(monkeypatch):
     resp = client.post("/api/social/deep-scan", json={"handle": "user"})
     assert resp.status_code == 200
     assert resp.json()["status"] == "success"
+
+
+def test_failed_tool_run_is_not_cached(monkeypatch):
+    import asyncio
+    import json
+    import subprocess
+    from app.services import social_service
+
+    runs = []
+
+    async def fake_run_tool(tool, cmd, cwd=None):
+        runs.append(tool)
+        if len(runs) == 1:
+            return subprocess.CompletedProcess(cmd, 1, "", "Traceback: crashed")
+        with open(cmd[cmd.index("--json") + 1], "w") as f:
+            json.dump({"GitHub": {"url": "https://github.com/user"}}, f)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(social_service, "run_tool", fake_run_tool)
+    monkeypatch.setattr(social_service, "_SCAN_CACHE", social_service.TTLCache(8, 60))
+
+    assert asyncio.run(social_service.a_run_sherlock("failing-user")) == []
+    accounts = asyncio.run(social_service.a_run_sherlock("failing-user"))
+    assert [a["profile"] for a in accounts] == ["https://github.com/user"]
+    assert runs == ["sherlock", "sherlock"]
+
+
+def test_scylla_usernames_retry_a_failed_fetch(monkeypatch):
+    import asyncio
+    from app.services import breach_service, phone_social_discovery
+
+    responses = [None, {"data": [{"username": "leaked_user"}]}]
+
+    async def flaky_get_json(url, source):
+        return responses.pop(0)
+
+    monkeypatch.setattr(breach_service, "_a_get_json", flaky_get_json)
+    monkeypatch.setattr(breach_service, "_RETRY_DELAY", 0)
+    monkeypatch.setattr(breach_service, "_SOURCE_CACHE", breach_service.TTLCache())
+
+    usernames = asyncio.run(phone_social_discovery._fetch_scylla_usernames("+1555"))
+    assert usernames == ["leaked_user"]
+    assert responses == []
@@ -0,0 +1,69 @@
+import asyncio
+import sys
+import threading
+import time
+
+from app.core import subprocess_pool
+from app.core.config import settings
+from app.core.metrics import SUBPROCESS_INFLIGHT
+
+
+def test_limit_is_shared_by_sync_and_async_runs(monkeypatch):
+    monkeypatch.setattr(settings, "subprocess_tool_concurrency", 1)
+    monkeypatch.setattr(subprocess_pool, "_limits", {})
+    cmd = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+    peak = []
+
+    def watch():
+        end = time.monotonic() + 1.0
+        while time.monotonic() < end:
+            peak.append(SUBPROCESS_INFLIGHT.value(tool="shared-test"))
+            time.sleep(0.01)
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    sync_run = threading.Thread(
+        target=subprocess_pool.run_tool_sync, args=("shared-test", cmd)
+    )
+    sync_run.start()
+
+    async def async_runs():
+        await asyncio.gather(
+            *(subprocess_pool.run_tool("shared-test", cmd) for _ in range(2))
+        )
+
+    asyncio.run(async_runs())
+    sync_run.join()
+    watcher.join()
+    assert max(peak) == 1
+
+
+def test_cancelled_run_is_reaped_and_frees_its_slot(monkeypatch):
+    monkeypatch.setattr(settings, "subprocess_tool_concurrency", 1)
+    monkeypatch.setattr(subprocess_pool, "_limits", {})
+    cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+    started = []
+    real_exec = asyncio.create_subprocess_exec
+
+    async def tracking_exec(*args, **kwargs):
+        proc = await real_exec(*args, **kwargs)
+        started.append(proc)
+        return proc
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", tracking_exec)
+
+    async def run():
+        task = asyncio.create_task(subprocess_pool.run_tool("cancel-test", cmd))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        done = await subprocess_pool.run_tool(
+            "cancel-test", [sys.executable, "-c", "print('ok')"]
+        )
+        return done.stdout
+
+    assert asyncio.run(run()).strip() == "ok"
+    assert started[0].returncode is not None